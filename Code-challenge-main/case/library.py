@@ -1,9 +1,14 @@
 
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
+import sys
 from typing import List, Dict, Optional
 
+try:
+    import orjson  # opsiyonel: varsa JSON kayıt/yükleme için hızlı yol
+except ImportError:
+    orjson = None
 
 
 def _today_str() -> str:
@@ -26,17 +31,97 @@ def _in_days_str(days: int) -> str:
     return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
 
 
+def _iso_to_int(s: str) -> int:
+    """
+    ISO tarihini (YYYY-MM-DD) karşılaştırılabilir tamsayıya çevirir (YYYYMMDD).
+    - Sıfır dolgulu biçimde strptime yerine doğrudan dilimleme kullanılır; gün/ay
+      geçerliliği date() ile yine denetlenir (ör. 2025-02-30 reddedilir).
+    - Diğer girdiler (ör. sıfırsız '2025-1-5') strptime ile eskisi gibi ayrıştırılır.
+    Parametreler:
+        s (str): ISO biçiminde tarih.
+    Dönüş:
+        int: YYYYMMDD biçiminde tamsayı.
+    Hatalar:
+        ValueError: Biçim ya da tarih geçersizse.
+    """
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit():
+        y, m, d = int(s[0:4]), int(s[5:7]), int(s[8:10])
+        date(y, m, d)
+    else:
+        dt = datetime.strptime(s, "%Y-%m-%d")
+        y, m, d = dt.year, dt.month, dt.day
+    return y * 10000 + m * 100 + d
+
+
 BOOKS: List[Dict] = [
     {"id": 1, "title": "Dune", "author": "Frank Herbert", "available": True,  "borrower": None, "due_date": None},
     {"id": 2, "title": "Kürk Mantolu Madonna", "author": "Sabahattin Ali", "available": True,  "borrower": None, "due_date": None},
     {"id": 3, "title": "1984", "author": "George Orwell", "available": False, "borrower": "ayse", "due_date": _in_days_str(-2)},  # gecikmiş örnek
 ]
 
+_INDEX_CACHE: Dict = {"books": None, "size": -1, "by_id": {}, "max_id": 0, "ids": []}
+
+
+def _book_index(books: List[Dict]) -> Dict:
+    """
+    Kitap listesi için id → liste pozisyonu sözlüğünü döndürür (O(1) arama).
+    - Son kullanılan liste ve uzunluğu saklanır; liste değişmişse indeks yeniden kurulur.
+    - Pozisyondaki kitap sonradan değiştirilmiş olabilir; isabet _find_book içinde doğrulanır.
+    - Aynı geçişte en büyük ID ve ID listesi de hesaplanıp saklanır (bkz. _next_book_id).
+    - Liste kanonik sıradır; indeks yalnızca hızlandırma içindir.
+    Parametreler:
+        books (List[Dict]): Kitap listesi.
+    Dönüş:
+        Dict: id → pozisyon eşlemesi.
+    """
+    if _INDEX_CACHE["books"] is not books or _INDEX_CACHE["size"] != len(books):
+        by_id = {}
+        max_id = 0
+        ids = [b.get("id") for b in books]
+        for pos, b in enumerate(books):
+            try:
+                by_id.setdefault(b.get("id"), pos)
+            except TypeError:
+                pass
+            try:
+                max_id = max(max_id, int(b.get("id")))
+            except Exception:
+                continue
+        _INDEX_CACHE.update(books=books, size=len(books), by_id=by_id, max_id=max_id, ids=ids)
+    return _INDEX_CACHE["by_id"]
+
+
+def _find_book(books: List[Dict], book_id: int) -> Optional[Dict]:
+    """
+    ID'si verilen kitabı indeks üzerinden bulur.
+    - İsabet, pozisyondaki kitabın hâlâ aynı ID'yi taşıdığı kontrol edilerek doğrulanır
+      (örn. books[i] = {...} ile yerinde değiştirme ya da yeniden sıralama sonrası).
+    - Iska ya da eskimiş isabette liste doğrusal taranır ve indeks yeniden kurulur.
+    Dönüş:
+        Optional[Dict]: Kitap bulunduysa sözlüğü, aksi halde None.
+    """
+    try:
+        pos = _book_index(books).get(book_id)
+    except TypeError:
+        return None
+    if pos is not None and books[pos].get("id") == book_id:
+        return books[pos]
+    for b in books:
+        if b.get("id") == book_id:
+            _INDEX_CACHE["books"] = None
+            return b
+    if pos is not None:
+        _INDEX_CACHE["books"] = None
+    return None
+
+
 def _next_book_id(books: List[Dict]) -> int:
     """
     Yeni kitap için benzersiz ID üretir.
     - Liste boşsa 1 döndürür.
     - Aksi halde listedeki en büyük ID’nin bir fazlasını verir.
+    - En büyük ID indekste saklanır; ayrıştırma yerine yalnızca ID'lerin değişmediği
+      doğrulanır (örn. books[i] = {...} ya da yerinde ID düzenlemesi sonrası yeniden kurulur).
     Parametreler:
         books (List[Dict]): Mevcut kitap listesi.
     Dönüş:
@@ -44,18 +129,11 @@ def _next_book_id(books: List[Dict]) -> int:
     """
     if not books:
         return 1
-
-    max_id = 0
-    for b in books:
-        try:
-            bid = int(b.get("id"))
-            if bid > max_id:
-                max_id = bid
-        except Exception:
-
-            continue
-
-    return max_id + 1
+    _book_index(books)
+    if [b.get("id") for b in books] != _INDEX_CACHE["ids"]:
+        _INDEX_CACHE["books"] = None
+        _book_index(books)
+    return _INDEX_CACHE["max_id"] + 1
 
 
 def add_book(books: List[Dict], title: str, author: str) -> Dict:
@@ -90,7 +168,12 @@ def add_book(books: List[Dict], title: str, author: str) -> Dict:
     }
 
 
+    by_id = _book_index(books)
     books.append(new_book)
+    by_id.setdefault(nid, len(books) - 1)
+    _INDEX_CACHE["size"] = len(books)
+    _INDEX_CACHE["max_id"] = max(_INDEX_CACHE["max_id"], nid)
+    _INDEX_CACHE["ids"].append(nid)
     return new_book
 
 
@@ -131,14 +214,14 @@ def borrow_book(books: List[Dict], book_id: int, username: str, days: int = 14)
      Returns:
          bool: Başarılıysa True, aksi halde False
      """
-    for b in books:
-        if b.get("id") == book_id:
-            if b.get("available"):
-                b["available"] = False
-                b["borrower"] = username
-                b["due_date"] = _in_days_str(days)
-                return True
-            return False
+    b = _find_book(books, book_id)
+    if b is None:
+        return False
+    if b.get("available"):
+        b["available"] = False
+        b["borrower"] = username
+        b["due_date"] = _in_days_str(days)
+        return True
     return False
 
 def return_book(books: List[Dict], book_id: int) -> bool:
@@ -150,13 +233,13 @@ def return_book(books: List[Dict], book_id: int) -> bool:
     Dönüş:
         bool: Kitap bulunduysa True, bulunamadıysa False.
     """
-    for b in books:
-        if b.get("id") == book_id:
-            b["available"] = True
-            b["borrower"]  = None
-            b["due_date"]  = None
-            return True
-    return False
+    b = _find_book(books, book_id)
+    if b is None:
+        return False
+    b["available"] = True
+    b["borrower"]  = None
+    b["due_date"]  = None
+    return True
 
 
 def list_overdue(books: List[Dict], today: Optional[str] = None) -> List[Dict]:
@@ -174,8 +257,7 @@ def list_overdue(books: List[Dict], today: Optional[str] = None) -> List[Dict]:
         """
     if today is None:
         today = _today_str()
-    fmt = "%Y-%m-%d"
-    today_dt = datetime.strptime(today, fmt)
+    today_int = _iso_to_int(today)
 
     out = []
     for book in books:
@@ -185,10 +267,10 @@ def list_overdue(books: List[Dict], today: Optional[str] = None) -> List[Dict]:
         if not isinstance(due, str) or due == "":
             continue
         try:
-            due_dt = datetime.strptime(due, fmt)
+            due_int = _iso_to_int(due)
         except ValueError:
             continue
-        if due_dt < today_dt:
+        if due_int < today_int:
             out.append(book)
     return out
 
@@ -202,10 +284,14 @@ def save_to_file(books: List[Dict], path: str) -> None:
            - UTF-8 formatında kaydeder.
            - ensure_ascii=False → Türkçe karakterleri korur.
            - indent=2 → okunabilir biçim.
+           - orjson kuruluysa onunla (bayt olarak, tek seferde) yazılır.
        """
-
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(books, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        data = orjson.dumps(books, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(books, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
 
 def load_from_file(path: str) -> List[Dict]:
     """
@@ -218,10 +304,10 @@ def load_from_file(path: str) -> List[Dict]:
        Dönüş:
            List[Dict]: Okunan kitap listesi veya boş liste.
        """
-    import json, sys
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
     except FileNotFoundError:
         print(f"Uyarı: '{path}' bulunamadı, boş liste döndürülüyor.", file=sys.stderr)
         return []
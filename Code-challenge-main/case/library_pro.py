@@ -14,40 +14,159 @@ Kütüphane (Pro, JSON) — JSON tabanlı CLI
 """
 
 from __future__ import annotations
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Callable, Tuple, Literal
-import json, logging, sys, unicodedata, re, os, csv, tempfile
+from datetime import datetime, timedelta, date
+from typing import List, Dict, Set, Optional, Callable, Tuple, Literal, Iterator
+import json, logging, sys, unicodedata, re, os, csv, tempfile, functools, bisect, operator, threading, atexit, mmap, time
+import importlib.util
 
 # ====== (opsiyonel) Rich ======
-HAS_RICH = False
+# Rich'in içe aktarım zinciri pahalı; başlangıçta yalnızca kurulu olup olmadığına bakılır,
+# modüller ilk çizimde _rich_ready() ile yüklenir (betik/kayıt odaklı çalıştırmalar bedel ödemez).
+HAS_RICH = importlib.util.find_spec("rich") is not None
+console = None
+
+def _plain(msg: str) -> None: print(msg)
+_ok = _err = _warn = _muted = _plain  # Rich yüklenince renkli sürümlerle değiştirilir
+_MARKUP_RE = re.compile(r"\[/?(?:ok|err|warn|muted|accent|title|hdr|b)\]")  # yalnızca tema etiketleri
+def _plain_markup(msg: str) -> None: print(_MARKUP_RE.sub("", msg))
+_say = _plain_markup  # satır içi işaretlemeli mesaj; Rich yüklenince console.print
+
+@functools.lru_cache(maxsize=None)
+def _rich_ready() -> bool:
+    global HAS_RICH, console, THEME, Console, Table, Panel, Text, ROUNDED, Columns, Theme
+    global Progress, SpinnerColumn, TextColumn, _ok, _err, _warn, _muted, _say
+    if not HAS_RICH: return False
+    try:
+        from rich.console import Console
+        from rich.table import Table
+        from rich.panel import Panel
+        from rich.text import Text
+        from rich.box import ROUNDED
+        from rich.columns import Columns
+        from rich.theme import Theme
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+
+        THEME = Theme({
+            "title": "bold cyan",
+            "accent": "bold magenta",
+            "muted": "grey66",
+            "ok": "bold green",
+            "warn": "bold yellow",
+            "err": "bold red",
+            "hdr": "bold white",
+            "status_av": "bold green",
+            "status_na": "bold red",
+            "pill_av": "black on green",
+            "pill_na": "white on red",
+        })
+        console = Console(theme=THEME, width=120)  # genişlik 120; Rich otomatik daraltır
+    except Exception:
+        console = None
+        HAS_RICH = False
+        return False
+    # Durum mesajları: Rich/düz çıktı seçimi bir kez yapılır, döngüde dal yok
+    _ok, _err, _warn, _muted = (_styled(s) for s in ("ok", "err", "warn", "muted"))
+    _say = console.print
+    return True
+
+def _styled(style: str) -> Callable[[str], None]:
+    return lambda msg: console.print(f"[{style}]{msg}[/{style}]")
+
+# ====== (opsiyonel) orjson ======
+HAS_ORJSON = False
 try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich.panel import Panel
-    from rich.text import Text
-    from rich.box import ROUNDED
-    from rich.columns import Columns
-    from rich.theme import Theme
-    from rich.progress import Progress, SpinnerColumn, TextColumn
-
-    THEME = Theme({
-        "title": "bold cyan",
-        "accent": "bold magenta",
-        "muted": "grey66",
-        "ok": "bold green",
-        "warn": "bold yellow",
-        "err": "bold red",
-        "hdr": "bold white",
-        "status_av": "bold green",
-        "status_na": "bold red",
-        "pill_av": "black on green",
-        "pill_na": "white on red",
-    })
-    console = Console(theme=THEME, width=120)  # genişlik 120; Rich otomatik daraltır
-    HAS_RICH = True
+    import orjson
+    HAS_ORJSON = True
 except Exception:
-    console = None
-    HAS_RICH = False
+    orjson = None
+
+def _dumps(obj, *, pretty: bool = True) -> bytes:
+    # pretty=False: girintisiz kompakt çıktı (sık yapılan otomatik kayıt için çok daha ucuz)
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=(orjson.OPT_INDENT_2 if pretty else 0) | orjson.OPT_NON_STR_KEYS)
+    if pretty: return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)  # orjson.JSONDecodeError ⊂ json.JSONDecodeError
+
+# ====== (opsiyonel) ijson ======
+HAS_IJSON = False
+try:
+    import ijson
+    HAS_IJSON = True
+except Exception:
+    ijson = None
+_STREAM_MIN = 10 * 1024 * 1024  # bu boyutun üstündeki dosyalar akışla ayrıştırılır (ham metin + ağaç aynı anda bellekte olmaz)
+
+# ====== (opsiyonel) msgpack ======
+HAS_MSGPACK = False
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except Exception:
+    msgpack = None
+# msgpack kök nesnesi map/array ise ilk bayt bunlardan biridir; JSON ise '{' / '[' / boşluk
+_MSGPACK_HEAD = frozenset([*range(0x80, 0xa0), 0xdc, 0xdd, 0xde, 0xdf])
+
+def _packb(obj) -> bytes:
+    if not HAS_MSGPACK: raise ValueError("msgpack biçimi için 'msgpack' paketi gerekli")
+    return msgpack.packb(obj, use_bin_type=True)
+
+def _unpackb(raw: bytes):
+    if not HAS_MSGPACK: raise json.JSONDecodeError("msgpack dosyası ama 'msgpack' kurulu değil", "", 0)
+    try: return msgpack.unpackb(raw, raw=False)
+    except (ValueError, msgpack.UnpackException) as e: raise json.JSONDecodeError(str(e), "", 0) from e
+
+# ====== (opsiyonel) NumPy ======
+# numpy'nin içe aktarımı başlangıç süresinin büyük kısmını tutar; yalnızca kurulu olup olmadığına
+# bakılır, modül ilk büyük (>= _VEC_MIN) gecikme hesabında _numpy_ready() ile yüklenir.
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+np = None
+
+@functools.lru_cache(maxsize=None)
+def _numpy_ready() -> bool:
+    global HAS_NUMPY, np
+    if not HAS_NUMPY: return False
+    try:
+        import numpy as np
+        return True
+    except Exception:
+        HAS_NUMPY = False
+        return False
+_VEC_MIN = 2048  # bu boyutun altında saf Python döngüsü daha hızlı
+
+# ====== (opsiyonel) Numba ======
+# numba'nın içe aktarımı (LLVM) saniyeler sürebilir; başlangıçta yalnızca kurulu olup olmadığına
+# bakılır, çekirdek ilk büyük gecikme hesabında _numba_kernel() ile yüklenir.
+HAS_NUMBA = HAS_NUMPY and importlib.util.find_spec("numba") is not None
+
+@functools.lru_cache(maxsize=None)
+def _numba_kernel() -> Optional[Callable]:
+    if not HAS_NUMBA or not _numpy_ready(): return None
+    try:
+        import numba
+
+        @numba.njit(cache=True)
+        def _overdue_kernel(due_e, today_e, now_e, fee_per_day):
+            # due_e: 1970'ten beri gün; gecikme maskesi + calc_fee(weekend_free=True) toplamı
+            n = due_e.shape[0]
+            mask = np.zeros(n, dtype=np.bool_)
+            total = 0.0
+            for i in range(n):
+                delay = today_e - due_e[i]
+                if delay <= 0: continue
+                mask[i] = True
+                days = (delay // 7) * 5
+                wd = (now_e - delay + 3) % 7  # pencere başı; 1970-01-01 perşembe (3)
+                for k in range(delay % 7):
+                    if (wd + k) % 7 < 5: days += 1
+                total += round(days * fee_per_day, 2)
+            return mask, total
+
+        return _overdue_kernel
+    except Exception:
+        return None
 
 # ANSI fallback
 ANSI_RED = "\033[31m"; ANSI_GREEN = "\033[32m"; ANSI_YELLOW = "\033[33m"; ANSI_RESET = "\033[0m"
@@ -63,37 +182,275 @@ class ValidationError(LibraryError): ...
 class NotFoundError(LibraryError): ...
 
 # ====== Yardımcılar ======
-def _today_str() -> str: return datetime.now().strftime("%Y-%m-%d")
-def _in_days_str(days: int) -> str: return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
-def _now_iso() -> str: return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+# Sabit biçimler: isoformat() strftime'ın biçim dizesi yorumlamasından ~2 kat ucuz
+def _today_str() -> str: return date.today().isoformat()
+def _in_days_str(days: int) -> str: return (date.today() + timedelta(days=days)).isoformat()
+def _now_iso() -> str: return datetime.now().isoformat(timespec="seconds")
+def _parse_ymd(s: str) -> date:
+    """strptime(s, '%Y-%m-%d') ile aynı kabul; sıfır dolgulu biçim dilimlenir (çok daha ucuz). Geçersizse ValueError."""
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit():
+        return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+    return datetime.strptime(s, "%Y-%m-%d").date()  # ör. '2025-1-5'
+def _parse_ymd_dt(s: str) -> datetime:
+    """'YYYY-MM-DD' → gece yarısı datetime (karşılaştırmalar için)."""
+    return datetime.combine(_parse_ymd(s), datetime.min.time())
+
+def _due_ord(b: Dict) -> Optional[int]:
+    """due_date'in gün sıra numarası (date.toordinal); geçersizse None. Tarih değişince önbellek kendiliğinden geçersizleşir."""
+    d = b.get("due_date")
+    if not isinstance(d, str) or not d: return None
+    c = b.get("_due_ord")
+    if c is not None and c[0] == d: return c[1]
+    try: o: Optional[int] = _parse_ymd(d).toordinal()
+    except ValueError:
+        o = None
+    b["_due_ord"] = (d, o)
+    return o
+
+log = logging.getLogger(__name__)  # sıcak yollarda isEnabledFor ile korunur
 
 def setup_logging(path: str = "library_log.txt", level: int = logging.INFO) -> None:
     logging.basicConfig(filename=path, level=level, format="%(asctime)s [%(levelname)s] %(message)s")
     root = logging.getLogger()
-    if not any(isinstance(h, logging.StreamHandler) for h in root.handlers):
+    # Betikle (pipe) çalıştırmada stdout'a ikinci kopya yazılmaz; dosya kaydı yeterli
+    if sys.stdout.isatty() and not any(isinstance(h, logging.StreamHandler) for h in root.handlers):
         root.addHandler(logging.StreamHandler(sys.stdout))
 
+# ====== İndeksler ======
+# Liste kanonik kalır; indeksler yalnızca hızlandırma içindir. Her liste için id(books) ile
+# tutulur, listeye güçlü referans saklanır (id yeniden kullanılamaz). Boyut değişirse
+# (dışarıdan append vb.) indeks kendini yeniden kurar; yerinde değiştirmede _rebuild_indexes çağrılır.
+# Arama yapıları liste pozisyonu tutar: aramadan önce stale() ile liste sırası/elemanları doğrulanır
+# (books.sort()/reverse() ya da books[i] = ... uzunluğu değiştirmez).
+_GRAM = 3  # ters indeks n-gram uzunluğu
+
+class _BookIndex:
+    __slots__ = ("books", "size", "refs", "by_id", "max_id", "grams", "mega", "starts", "dups", "pfx", "titles", "authors", "ids")
+
+    def __init__(self, books: List[Dict]):
+        self.books = books; self.size = 0; self.max_id = 0
+        self.refs: List[Dict] = []  # indekslendiği sıradaki kitaplar (pozisyon → kitap)
+        self.titles: List[object] = []; self.authors: List[object] = []  # indekslenen anahtarların kaynağı
+        self.ids: List[object] = []  # by_id / max_id'nin kaynağı
+        self.by_id: Dict[int, int] = {}  # id → liste pozisyonu (isabet _find_book'ta doğrulanır)
+        self.grams: Optional[Dict[str, Set[int]]] = None  # ilk aramada kurulur
+        self.mega: Optional[str] = None                    # tüm anahtarlar '\x00' ile birleşik (kısa tokenlar için)
+        self.starts: List[int] = []
+        self.dups: Optional[Set[Tuple[str, str]]] = None   # (başlık, yazar) norm anahtarları; ilk kontrolde kurulur
+        self.pfx: Optional[Tuple[List[str], List[int], List[str], List[int]]] = None  # sıralı önek anahtarları
+        for b in books: self.add(b)
+
+    def add(self, b: Dict, dup: Optional[Tuple[str, str]] = None) -> None:
+        # dup: çağıran (başlık, yazar) anahtarını zaten hesapladıysa yeniden normalize edilmez
+        bid = b.get("id")
+        try: self.by_id.setdefault(bid, self.size)  # aynı id'de ilk kayıt kazanır (eski tarama ile aynı)
+        except TypeError: pass              # hash'lenemeyen id → indekslenmez
+        try: self.max_id = max(self.max_id, int(bid))
+        except Exception: pass
+        if self.grams is not None: self._add_grams(self.size, b)
+        if self.dups is not None: self.dups.add(dup or _dup_key(b.get("title"), b.get("author")))
+        self.mega = None; self.pfx = None  # bir sonraki aramada yeniden kurulur
+        self.refs.append(b); self.titles.append(b.get("title")); self.authors.append(b.get("author")); self.ids.append(bid)
+        self.size += 1
+
+    def stale(self) -> bool:
+        """Liste indekslendiğinden beri yeniden sıralandı, elemanı değiştirildi ya da id/başlık/yazar düzenlendiyse True."""
+        bs = self.books
+        if len(bs) != len(self.refs) or not all(map(operator.is_, bs, self.refs)): return True
+        try:
+            return (list(map(_ID, bs)) != self.ids or list(map(_TITLE, bs)) != self.titles
+                    or list(map(_AUTHOR, bs)) != self.authors)
+        except KeyError:  # alanı eksik kayıt → yavaş ama güvenli yol
+            return ([b.get("id") for b in bs] != self.ids or [b.get("title") for b in bs] != self.titles
+                    or [b.get("author") for b in bs] != self.authors)
+
+    def has_dup(self, key: Tuple[str, str]) -> bool:
+        # Küme başlık/yazar düzenlemelerini izlemez; çağıranlar indeksi _index(books, verify=True) ile alır
+        if self.dups is None: self.dups = {_dup_key(b.get("title"), b.get("author")) for b in self.books}
+        return key in self.dups
+
+    def _add_grams(self, pos: int, b: Dict) -> None:
+        H = _hay(b, True)
+        for i in range(len(H) - _GRAM + 1):
+            self.grams.setdefault(H[i:i+_GRAM], set()).add(pos)
+
+    def _postings(self, tok: str) -> Set[int]:
+        # tok'u içeren kitapların aday kümesi: tüm trigramlarının kesişimi (doğrulama çağıranda)
+        out: Optional[Set[int]] = None
+        for i in range(len(tok) - _GRAM + 1):
+            p = self.grams.get(tok[i:i+_GRAM])
+            if not p: return set()
+            out = set(p) if out is None else out & p
+            if not out: break
+        return out or set()
+
+    def _scan_mega(self, tok: str) -> Set[int]:
+        # Tek büyük metinde C seviyesinde str.find; eşleşme ofseti bisect ile kitap pozisyonuna çevrilir
+        if self.mega is None:
+            hays = [_hay(b, True) for b in self.books]
+            self.starts = []; off = 0
+            for h in hays: self.starts.append(off); off += len(h) + 1
+            self.mega = "\x00".join(hays)
+        mega, starts = self.mega, self.starts
+        out: Set[int] = set(); i = mega.find(tok)
+        while i != -1:
+            p = bisect.bisect_right(starts, i) - 1
+            out.add(p)
+            nxt = starts[p + 1] if p + 1 < len(starts) else len(mega)
+            i = mega.find(tok, nxt)  # aynı kitapta tekrar aramaya gerek yok
+        return out
+
+    def prefix_candidates(self, toks: List[str]) -> List[int]:
+        """'prefix' modu adayları: sıralı anahtarlarda bisect + ardışık tarama (O(log n + eşleşme))."""
+        if self.pfx is None:
+            norm = sorted((_hay(b, True), p) for p, b in enumerate(self.books))
+            raw = sorted(((b.get("title") or "").lower(), p) for p, b in enumerate(self.books))
+            self.pfx = ([k for k, _ in norm], [p for _, p in norm], [k for k, _ in raw], [p for _, p in raw])
+        nk, npos, rk, rpos = self.pfx
+        out: Set[int] = set()
+        for keys, poss in ((nk, npos), (rk, rpos)):  # normalize anahtar ya da ham küçük harf başlık
+            for tok in toks:
+                i = bisect.bisect_left(keys, tok)
+                while i < len(keys) and keys[i].startswith(tok):
+                    out.add(poss[i]); i += 1
+        return sorted(out)
+
+    def candidates(self, toks: List[str], mode: str) -> Optional[List[int]]:
+        """Normalize 'any'/'all' araması için aday pozisyonlar (sıralı); None → tam tarama."""
+        if not toks or any("\x00" in t for t in toks): return None
+        if self.grams is None and any(len(t) >= _GRAM for t in toks):
+            self.grams = {}
+            for pos, b in enumerate(self.books): self._add_grams(pos, b)
+        # uzun token → n-gram adayları (doğrulanır), kısa token → büyük metinde kesin eşleşme
+        sets = [self._postings(t) if len(t) >= _GRAM else self._scan_mega(t) for t in toks]
+        cand = set.intersection(*sets) if mode == "all" else set.union(*sets)
+        return sorted(cand)
+
+_ID = operator.itemgetter("id")
+_TITLE = operator.itemgetter("title")
+_AUTHOR = operator.itemgetter("author")
+
+# İndeks listeyi (books) güçlü referansla tutar: list weakref desteklemez. Bırakılan listeler
+# en fazla _INDEX_LIMIT indeks boyunca bellekte kalır, sonra en eski girdiyle birlikte düşer.
+_INDEXES: Dict[int, _BookIndex] = {}
+_INDEX_LIMIT = 8
+
+def _rebuild_indexes(books: List[Dict]) -> _BookIndex:
+    _INDEXES.pop(id(books), None)
+    while len(_INDEXES) >= _INDEX_LIMIT:
+        _INDEXES.pop(next(iter(_INDEXES)))
+    idx = _INDEXES[id(books)] = _BookIndex(books)
+    return idx
+
+def _index(books: List[Dict], *, verify: bool = False) -> _BookIndex:
+    # verify: pozisyon tabanlı yapılar (arama) ya da max_id/kopya kümesi (ekleme) kullanılacaksa
+    # sıra/eleman ve id/başlık/yazar değişikliği de denetlenir (O(n), C'de)
+    idx = _INDEXES.get(id(books))
+    if idx is None or idx.books is not books or idx.size != len(books) or (verify and idx.stale()):
+        idx = _rebuild_indexes(books)
+    return idx
+
+def _find_book(books: List[Dict], book_id: int) -> Optional[Dict]:
+    try: pos = _index(books).by_id.get(book_id)
+    except TypeError: return None
+    if pos is not None:
+        b = books[pos]
+        if b.get("id") == book_id: return b  # pozisyondaki kitap hâlâ bu id'yi taşıyor
+    # Iska ya da eskimiş isabet (books[i] = ... / yeniden sıralama): doğrusal tarama, bulunursa indeks yenilenir
+    for b in books:
+        if b.get("id") == book_id:
+            _rebuild_indexes(books); return b
+    if pos is not None: _rebuild_indexes(books)
+    return None
+
 # ====== Türkçe & aksan normalize ======
 _TR_MAP = str.maketrans({"I": "ı", "İ": "i"})
-def tr_lower(s: str) -> str: return s.translate(_TR_MAP).lower()
+@functools.lru_cache(maxsize=4096)
+def tr_lower(s: str) -> str: return s.translate(_TR_MAP).lower()  # yazar/başlık parçaları sık tekrarlanır
+def _combining_class_re() -> "re.Pattern[str]":
+    # BMP'deki tüm birleşen işaretler (unicodedata.combining != 0) aralıklara sıkıştırılır; içe aktarımda ~5 ms
+    spans: List[List[int]] = []
+    for i in range(0x10000):
+        if unicodedata.combining(chr(i)):
+            if spans and spans[-1][1] == i - 1: spans[-1][1] = i
+            else: spans.append([i, i])
+    return re.compile("[" + "".join(f"\\u{lo:04x}-\\u{hi:04x}" for lo, hi in spans) + "]")
+_COMBINING_RE = _combining_class_re()
+# Türkçe harflerin NFKD + işaret silme sonucu; 'ı' ayrışmadığı için olduğu gibi kalır
+_TR_FOLD = str.maketrans("çğöşüÇĞÖŞÜİâîûÂÎÛ", "cgosuCGOSUIaiuAIU")
+@functools.lru_cache(maxsize=2048)
 def strip_accents(s: str) -> str:
-    nfkd = unicodedata.normalize("NFKD", s)
-    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
+    if s.isascii(): return s  # NFKD ASCII'yi değiştirmez; çeviri tablosuna bile gerek yok
+    t = s.translate(_TR_FOLD)  # hızlı yol: yalnızca ASCII + Türkçe harf içeren metinde NFKD gerekmez
+    if t.isascii() or t.replace("ı", "").isascii(): return t
+    # Karakter başına Python çağrısı yerine regex C'de süpürür; BMP dışı nadir durumda eski yol
+    out = _COMBINING_RE.sub("", unicodedata.normalize("NFKD", s))
+    if out.isascii() or max(out) <= "\uffff": return out
+    return "".join(ch for ch in out if not unicodedata.combining(ch))
+@functools.lru_cache(maxsize=4096)
+def _norm_key_cached(s: str) -> str:
+    return tr_lower(strip_accents(s.strip()))
 def norm_key(s: Optional[str]) -> str:
     if not s: return ""
-    return tr_lower(strip_accents(str(s).strip()))
+    return _norm_key_cached(str(s))
+def norm_key_batch(items: List[str]) -> List[str]:
+    """norm_key'in toplu hali: metinler birleştirilip tek seferde (C seviyesinde) normalize edilir."""
+    items = [str(x).strip() if x else "" for x in items]
+    if not items or any(_BATCH_SEP in x for x in items): return [norm_key(x) for x in items]
+    # ayraç harf değildir → NFKD/lower (sigma dahil) öğe sınırını aşmaz
+    s = _BATCH_SEP.join(items)
+    if not s.isascii():  # uzun metinde sözlüklü translate yavaş; NFKD + regex C'de kalır
+        s = _COMBINING_RE.sub("", unicodedata.normalize("NFKD", s))
+        if max(s) > "\uffff": return [norm_key(x) for x in items]  # BMP dışı işaretler → tek tek
+    return s.replace("I", "ı").lower().split(_BATCH_SEP)  # 'İ' NFKD'de zaten 'I'ya indi
+_BATCH_SEP = "\x00"
+def _dup_key(title: Optional[str], author: Optional[str]) -> Tuple[str, str]:
+    return norm_key(title), norm_key(author)
+_TR_HEAD = {"i": "İ", "ı": "I"}  # Türkçe kelime başı; diğerleri str.upper()
 def titlecase_tr(s: str) -> str:
     if not isinstance(s, str): return ""
-    words = s.strip().split(); out = []
-    for w in words:
-        if not w: continue
-        first, rest = w[0], w[1:]
-        head = "İ" if first == "i" else ("I" if first == "ı" else first.upper())
-        out.append(head + tr_lower(rest))
-    return " ".join(out)
+    return _titlecase_tr_cached(s)
+@functools.lru_cache(maxsize=4096)  # yazar adları (ve CSV'de tekrar eden satırlar) sık tekrarlanır
+def _titlecase_tr_cached(s: str) -> str:
+    words = s.split()
+    if "Σ" in s:  # son-sigma kuralı bağlama bakar → kelime gövdesi ayrı küçültülür
+        return " ".join((_TR_HEAD.get(w[0]) or w[0].upper()) + tr_lower(w[1:]) for w in words)
+    # Tüm metin tek geçişte küçültülür ('İ' önceden 'i' yapıldığı için uzunluk korunur);
+    # kelime başları özgün metinden büyütülür
+    low = s.replace("I", "ı").replace("İ", "i").lower().split()
+    return " ".join((_TR_HEAD.get(w[0]) or w[0].upper()) + l[1:] for w, l in zip(words, low))
+
+@functools.lru_cache(maxsize=128)
+def _compile(pattern: str, flags: int = 0) -> re.Pattern:
+    return re.compile(pattern, flags)
+
+# ====== Önbellekli arama anahtarları ======
+# '_' ile başlayan alanlar bellek içi önbellektir; dosyaya yazılmaz.
+# Önbellek kaynağıyla birlikte saklanır: başlık/yazar sonradan düzenlenirse anahtar yeniden hesaplanır.
+def _hay(b: Dict, normalize: bool = True) -> str:
+    key = "_norm" if normalize else "_hay_lower"
+    t = b.get("title", ""); a = b.get("author", "")
+    c = b.get(key)  # (başlık, yazar, anahtar); kimlik karşılaştırması yeterli ve ucuz
+    if c is None or c[0] is not t or c[1] is not a:
+        s = f"{t} {a}".strip()
+        c = b[key] = (t, a, norm_key(s) if normalize else s.lower())
+    return c[2]
+
+def _sort_key(b: Dict) -> str:
+    t = b.get("title")
+    c = b.get("_sort_key")  # (başlık, anahtar)
+    if c is None or c[0] is not t: c = b["_sort_key"] = (t, str(t or "").lower())
+    return c[1]
+
+def _sorted_by_title(books: List[Dict]) -> List[Dict]:
+    return sorted(books, key=_sort_key)
+
+def _public(b: Dict) -> Dict:
+    return {k: v for k, v in b.items() if not k.startswith("_")}
 
 # ====== Atomic JSON + Migration ======
-def _atomic_write_json(data, path: str, *, with_meta: bool = True):
+def _atomic_write_json(data, path: str, *, with_meta: bool = True, pretty: bool = True, fmt: str = "json"):
+    data = [_public(b) if isinstance(b, dict) else b for b in data]
     payload = {
         "version": "pro-3",
         "saved_at": _now_iso(),
@@ -101,10 +458,36 @@ def _atomic_write_json(data, path: str, *, with_meta: bool = True):
         "books": data,
     } if with_meta else data
     dir_name = os.path.dirname(os.path.abspath(path)) or "."
-    with tempfile.NamedTemporaryFile("w", delete=False, dir=dir_name, encoding="utf-8") as tmp:
-        json.dump(payload, tmp, ensure_ascii=False, indent=2)
+    # serileştirme hatası geçici dosya oluşmadan yükselir
+    raw = _packb(payload) if fmt == "msgpack" else _dumps(payload, pretty=pretty)
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=dir_name) as tmp:
         tmp_path = tmp.name
-    os.replace(tmp_path, path)  # atomic replace
+        try:
+            tmp.write(raw)  # tek seferde bayt yazımı
+            tmp.flush(); os.fsync(tmp.fileno())  # içerik diske inmeden yeniden adlandırma yapılmaz
+        except BaseException:
+            tmp.close(); os.unlink(tmp_path); raise  # yarım geçici dosya dizinde kalmasın
+    try: os.replace(tmp_path, path)  # atomic replace
+    except BaseException:
+        os.unlink(tmp_path); raise
+    _fsync_dir(dir_name)  # yeniden adlandırmanın kendisi de kalıcı olsun
+
+def _fsync_dir(dir_name: str) -> None:
+    try: fd = os.open(dir_name, os.O_RDONLY)
+    except OSError: return  # ör. Windows'ta dizin açılamaz; orada os.replace yeterli
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+# Yazar/ödünç alan/bekleyen adları kayıtlar arasında çok tekrarlanır; JSON'dan her biri ayrı
+# kopya olarak gelir. Tek kopyaya indirmek büyük katalogda belleği ve karşılaştırmayı hafifletir.
+_INTERN_FIELDS = ("author", "borrower")
+def _intern_fields(b: Dict) -> None:
+    for k in _INTERN_FIELDS:
+        v = b.get(k)
+        if type(v) is str: b[k] = sys.intern(v)
+    wl = b.get("waitlist")
+    if type(wl) is list and wl: wl[:] = [sys.intern(x) if type(x) is str else x for x in wl]
 
 def _migrate_if_needed(books: List[Dict]) -> List[Dict]:
     changed = False
@@ -117,19 +500,97 @@ def _migrate_if_needed(books: List[Dict]) -> List[Dict]:
             b["waitlist"] = []; changed = True
         if "borrowed_at" not in b:
             b["borrowed_at"] = None; changed = True
+        _intern_fields(b)
+        _sort_key(b)  # sıralama anahtarını yüklemede bir kez hesapla
+    todo = [b for b in books if "_norm" not in b]  # arama anahtarları tek toplu çağrıyla
+    for b, k in zip(todo, norm_key_batch([f"{b.get('title','')} {b.get('author','')}" for b in todo])):
+        b["_norm"] = (b.get("title", ""), b.get("author", ""), k)
     if changed:
-        logging.info("Kayıtlar yeni şemaya yükseltildi.")
+        log.info("Kayıtlar yeni şemaya yükseltildi.")
     return books
 
 # ====== Kalıcılık ======
-def save_to_file_meta(books: List[Dict], path: str, *, with_meta: bool = True) -> None:
-    _atomic_write_json(books, path, with_meta=with_meta)
-    logging.info("Dosyaya kaydedildi: %s (meta=%s)", path, with_meta)
+# Son yüklenen içerik (mtime_ns, boyut) imzasıyla saklanır; dosya değişmediyse yeniden
+# ayrıştırılmaz. Çağıranlar kitapları değiştirdiği için her seferinde kopya döndürülür.
+# _STREAM_MIN üstündeki dosyalar önbelleğe alınmaz: kopya, çağıranın listesiyle birlikte belleği ikiye katlardı.
+_LOAD_CACHE: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+_LOAD_CACHE_LIMIT = 4
+
+def _copy_book(b: Dict) -> Dict:
+    c = dict(b)
+    if isinstance(c.get("waitlist"), list): c["waitlist"] = list(c["waitlist"])
+    return c
+
+def _stream_books(path: str) -> List[Dict]:
+    with open(path, "rb") as f:
+        head = f.read(64).lstrip()[:1]; f.seek(0)
+        prefix = "books.item" if head == b"{" else "item"  # meta sarmalı ya da çıplak liste
+        try: return list(ijson.items(f, prefix, use_float=True))
+        except ijson.JSONError as e: raise json.JSONDecodeError(str(e), "", 0) from e
+
+def _read_json(path: str, size: int = 0):
+    with open(path, "rb") as f:
+        head = f.read(1)
+        if head and head[0] in _MSGPACK_HEAD: return _unpackb(head + f.read())
+        f.seek(0)
+        if HAS_IJSON and size > _STREAM_MIN: return _stream_books(path)
+        if HAS_ORJSON:
+            # orjson eşlenmiş sayfalardan doğrudan ayrıştırır; ara bytes kopyası oluşmaz
+            try: mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: mm = None  # boş dosya eşlenemez (stat'tan sonra boşaltılmış olabilir)
+            if mm is not None:
+                with mm, memoryview(mm) as mv:
+                    return orjson.loads(mv)
+        return _loads(f.read())
+
+def save_to_file_meta(books: List[Dict], path: str, *, with_meta: bool = True, pretty: bool = True,
+                      fmt: Literal["json", "msgpack"] = "json") -> None:
+    # fmt="msgpack": ikili, daha küçük dosya; yükleme ilk bayttan biçimi kendisi tanır
+    _atomic_write_json(books, path, with_meta=with_meta, pretty=pretty, fmt=fmt)
+    _LOAD_CACHE.pop(os.path.abspath(path), None)
+    try: os.remove(_log_path(path))  # tam anlık görüntü günlükteki her şeyi içerir
+    except FileNotFoundError: pass
+    log.info("Dosyaya kaydedildi: %s (meta=%s)", path, with_meta)
+
+# Değişiklik günlüğü (NDJSON): tek kitaplık değişiklik tüm dosyayı yeniden yazmaz, '<yol>.log'a
+# bir satır eklenir. Yüklemede anlık görüntünün üstüne oynatılır; tam kayıtta silinir.
+def _log_path(path: str) -> str: return path + ".log"
+
+def _append_event(path: str, book: Dict) -> None:
+    with open(_log_path(path), "ab") as f:
+        f.write(_dumps({"op": "put", "book": _public(book)}, pretty=False) + b"\n")
+
+def _replay_log(books: List[Dict], path: str) -> int:
+    try:
+        with open(_log_path(path), "rb") as f: lines = f.read().splitlines()
+    except FileNotFoundError:
+        return 0
+    idx = _index(books); n = 0
+    for line in lines:
+        try: ev = _loads(line)
+        except json.JSONDecodeError: continue  # çökmede yarım kalan satır atlanır
+        b = ev.get("book") if isinstance(ev, dict) and ev.get("op") == "put" else None
+        if not isinstance(b, dict): continue
+        cur = _find_book(books, b.get("id"))
+        if cur is None:
+            _migrate_if_needed([b]); books.append(b); idx.add(b)
+        else:
+            cur.clear(); cur.update(b); _migrate_if_needed([cur])
+        n += 1
+    if n:
+        _rebuild_indexes(books)  # güncellenen kayıtların n-gram/kopya anahtarları tazelensin
+        log.info("Değişiklik günlüğünden %d kayıt uygulandı: %s", n, _log_path(path))
+    return n
 
 def load_from_file_safe(path: str, *, on_missing: Optional[Callable[[str], None]] = None) -> List[Dict]:
+    key = os.path.abspath(path)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        st = os.stat(path); sig = (st.st_mtime_ns, st.st_size)
+        hit = _LOAD_CACHE.get(key)
+        if hit and hit[0] == sig:
+            return [_copy_book(b) for b in hit[1]]
+        if not st.st_size: raise json.JSONDecodeError("boş dosya", "", 0)  # açıp ayrıştırmaya gerek yok
+        data = _read_json(path, st.st_size)
     except FileNotFoundError:
         msg = f"Uyarı: '{path}' bulunamadı, boş liste döndürülüyor."
         if on_missing: on_missing(msg)
@@ -139,10 +600,17 @@ def load_from_file_safe(path: str, *, on_missing: Optional[Callable[[str], None]
         print(f"Uyarı: '{path}' bozuk JSON, boş liste döndürülüyor.", file=sys.stderr)
         return []
     if isinstance(data, dict) and "books" in data and isinstance(data["books"], list):
-        return _migrate_if_needed(list(data["books"]))
-    if isinstance(data, list):
-        return _migrate_if_needed(list(data))
-    return []
+        books = _migrate_if_needed(list(data["books"]))
+    elif isinstance(data, list):
+        books = _migrate_if_needed(list(data))
+    else:
+        return []
+    _LOAD_CACHE.pop(key, None)
+    if sig[1] > _STREAM_MIN: return books  # büyük dosya → önbelleksiz
+    while len(_LOAD_CACHE) >= _LOAD_CACHE_LIMIT:
+        _LOAD_CACHE.pop(next(iter(_LOAD_CACHE)))
+    _LOAD_CACHE[key] = (sig, [_copy_book(b) for b in books])
+    return books
 
 # ====== Çekirdek işlevler ======
 def add_book_pro(books: List[Dict], title: str, author: str, *, disallow_duplicates: bool = False) -> Dict:
@@ -151,29 +619,31 @@ def add_book_pro(books: List[Dict], title: str, author: str, *, disallow_duplica
     t, a = title.strip(), author.strip()
     if not t or not a:
         raise ValidationError("title/author boş olamaz")
-    t, a = titlecase_tr(t), titlecase_tr(a)
-    if disallow_duplicates:
-        t_norm, a_norm = norm_key(t), norm_key(a)
-        for b in books:
-            if norm_key(b.get("title")) == t_norm and norm_key(b.get("author")) == a_norm:
-                raise DuplicateBookError("Bu kitap (başlık+yazar) zaten mevcut.")
-    max_id = 0
-    for b in books:
-        try:
-            bid = int(b.get("id")); max_id = max(max_id, bid)
-        except Exception:
-            continue
-    nid = max_id + 1 if books else 1
-    new_book = {
+    new_book = _add_book(books, t, a, disallow_duplicates=disallow_duplicates)
+    log.info("Kitap eklendi: %s (%s) [id=%s]", new_book["title"], new_book["author"], new_book["id"])
+    return new_book
+
+def _add_book(books: List[Dict], t: str, a: str, *, disallow_duplicates: bool, created_at: Optional[str] = None) -> Dict:
+    # Doğrulanmış (kırpılmış, boş olmayan) metinle ekleme; kayıt (log) çağırana bırakılır (toplu içe aktarma)
+    t, a = titlecase_tr(t), sys.intern(titlecase_tr(a))
+    idx = _index(books, verify=True); k = _dup_key(t, a)  # yerinde düzenlenen id/başlık da görülür
+    if disallow_duplicates and idx.has_dup(k):  # O(1) küme kontrolü
+        raise DuplicateBookError("Bu kitap (başlık+yazar) zaten mevcut.")
+    nid = idx.max_id + 1  # sayaç O(1); tüm listeyi taramaya gerek yok
+    new_book = _make_book(nid, t, a, created_at or _now_iso(), norm_key(f"{t} {a}"))
+    books.append(new_book); idx.add(new_book, k)
+    return new_book
+
+def _make_book(nid: int, t: str, a: str, created_at: str, norm: str) -> Dict:
+    return {
         "id": nid, "title": t, "author": a,
         "available": True, "borrower": None, "due_date": None,
         "borrowed_at": None,
-        "created_at": _now_iso(),
+        "created_at": created_at,
         "waitlist": [],
+        "_norm": (t, a, norm),
+        "_sort_key": (t, t.lower()),
     }
-    books.append(new_book)
-    logging.info("Kitap eklendi: %s (%s) [id=%s]", t, a, nid)
-    return new_book
 
 def search_books_adv(
     books: List[Dict], query: str, *,
@@ -185,24 +655,34 @@ def search_books_adv(
 ) -> List[Dict]:
     if not query or not str(query).strip(): return []
     q_raw = str(query).strip()
-    def hay(b: Dict) -> str:
-        s = f"{b.get('title','')} {b.get('author','')}".strip()
-        return norm_key(s) if normalize else s.lower()
     if regex:
-        pat = re.compile(norm_key(q_raw) if normalize else q_raw, re.IGNORECASE)
-        res = [b for b in books if pat.search(hay(b))]
+        pat = _compile(norm_key(q_raw) if normalize else q_raw, re.IGNORECASE)
+        res = [b for b in books if pat.search(_hay(b, normalize))]
     else:
         toks = (norm_key(q_raw) if normalize else q_raw.lower()).split()
-        res = []
-        for b in books:
-            H = hay(b)
-            if mode == "all":
-                ok = all(tok in H for tok in toks)
-            elif mode == "prefix":
-                ok = any(H.startswith(tok) or (b.get("title") or "").lower().startswith(tok) for tok in toks)
-            else:
-                ok = any(tok in H for tok in toks)
-            if ok: res.append(b)
+        pool = books
+        if normalize and mode in ("any", "all"):
+            cand = _index(books, verify=True).candidates(toks, mode)
+            if cand is not None: pool = [books[i] for i in cand]
+        elif normalize and mode == "prefix" and toks:
+            pool = [books[i] for i in _index(books, verify=True).prefix_candidates(toks)]
+        # kip çağrı başına sabit → eşleştirici döngüden önce bir kez seçilir, satır başına dallanma yok
+        if mode == "all":
+            def match(b: Dict) -> bool:
+                H = _hay(b, normalize); return all(tok in H for tok in toks)
+        elif mode == "prefix":
+            def match(b: Dict) -> bool:
+                H = _hay(b, normalize); T = (b.get("title") or "").lower()
+                return any(H.startswith(tok) or T.startswith(tok) for tok in toks)
+        elif len(toks) > 1:  # 'any' + çok token: tek alternasyon deseni kitap başına tek C geçişi yapar (H zaten küçük harf)
+            alt = _compile("|".join(map(re.escape, toks))).search
+            def match(b: Dict) -> bool: return alt(_hay(b, normalize)) is not None
+        elif toks:
+            tok = toks[0]
+            def match(b: Dict) -> bool: return tok in _hay(b, normalize)
+        else:
+            def match(b: Dict) -> bool: return False  # normalize sonrası boş sorgu hiçbir şeyle eşleşmez
+        res = [b for b in pool if match(b)]
     if available is not None:
         res = [b for b in res if bool(b.get("available")) is available]
     if borrower:
@@ -210,9 +690,8 @@ def search_books_adv(
         res = [b for b in res if norm_key(b.get("borrower")) == key]
     if due_before:
         try:
-            lim = datetime.strptime(due_before, "%Y-%m-%d")
-            res = [b for b in res if isinstance(b.get("due_date"), str) and b["due_date"]
-                   and datetime.strptime(b["due_date"], "%Y-%m-%d") < lim]
+            lim = _parse_ymd_dt(due_before)
+            res = [b for b in res if (dd := _due_days_from(b, lim)) is not None and dd < 0]
         except ValueError:
             pass
     if order_by == "author":
@@ -222,37 +701,36 @@ def search_books_adv(
     elif order_by == "created":
         res.sort(key=lambda x: (x.get("created_at") or "0000-01-01"), reverse=True)
     else:
-        res.sort(key=lambda x: (str(x.get("title") or "").lower(),))
-    logging.info("Arama '%s' (mode=%s) → %d sonuç", q_raw, mode, len(res))
+        res = _sorted_by_title(res)
+    if log.isEnabledFor(logging.INFO): log.info("Arama '%s' (mode=%s) → %d sonuç", q_raw, mode, len(res))
     return res
 
 def borrow_book_safe(books: List[Dict], book_id: int, username: str, days: int = 14) -> bool:
     if not isinstance(book_id, int): raise ValidationError("book_id int olmalı")
     if not isinstance(days, int) or days <= 0: raise ValidationError("days>0 olmalı")
     if not isinstance(username, str) or not username.strip(): raise ValidationError("username boş olamaz")
-    for b in books:
-        if b.get("id") == book_id:
-            if b.get("available"):
-                b["available"] = False
-                b["borrower"] = username.strip()
-                b["borrowed_at"] = _today_str()           # Aldığı
-                b["due_date"]   = _in_days_str(days)      # Teslim
-                logging.info("Ödünç: id=%s → %s (borrowed_at=%s, due=%s)", book_id, username, b["borrowed_at"], b["due_date"])
-                return True
-            logging.warning("Meşgul: id=%s (borrower=%s)", book_id, b.get("borrower"))
-            return False
-    raise NotFoundError(f"Kitap yok: id={book_id}")
+    b = _find_book(books, book_id)
+    if b is None: raise NotFoundError(f"Kitap yok: id={book_id}")
+    if b.get("available"):
+        b["available"] = False
+        b["borrower"] = username.strip()
+        b["borrowed_at"] = _today_str()           # Aldığı
+        b["due_date"]   = _in_days_str(days)      # Teslim
+        if log.isEnabledFor(logging.INFO):
+            log.info("Ödünç: id=%s → %s (borrowed_at=%s, due=%s)", book_id, username, b["borrowed_at"], b["due_date"])
+        return True
+    log.warning("Meşgul: id=%s (borrower=%s)", book_id, b.get("borrower"))
+    return False
 
 def join_waitlist(books: List[Dict], book_id: int, username: str) -> bool:
-    for b in books:
-        if b.get("id") == book_id:
-            if b.get("available"): return False
-            wl = b.setdefault("waitlist", [])
-            key = norm_key(username)
-            if any(norm_key(x) == key for x in wl): return False
-            wl.append(username.strip()); logging.info("Waitlist: id=%s ← %s", book_id, username)
-            return True
-    raise NotFoundError(f"Kitap yok: id={book_id}")
+    b = _find_book(books, book_id)
+    if b is None: raise NotFoundError(f"Kitap yok: id={book_id}")
+    if b.get("available"): return False
+    wl = b.setdefault("waitlist", [])
+    key = norm_key(username)
+    if any(norm_key(x) == key for x in wl): return False
+    wl.append(username.strip()); log.info("Waitlist: id=%s ← %s", book_id, username)
+    return True
 
 def _assign_next_waiter(b: Dict) -> Optional[str]:
     wl = b.get("waitlist") or []
@@ -262,103 +740,136 @@ def _assign_next_waiter(b: Dict) -> Optional[str]:
     b["borrower"] = user
     b["borrowed_at"] = _today_str()
     b["due_date"] = _in_days_str(14)
-    logging.info("Auto-assign: %s → id=%s (borrowed_at=%s, due=%s)", user, b.get("id"), b["borrowed_at"], b["due_date"])
+    log.info("Auto-assign: %s → id=%s (borrowed_at=%s, due=%s)", user, b.get("id"), b["borrowed_at"], b["due_date"])
     return user
 
 def return_book_with_delay(books: List[Dict], book_id: int) -> Tuple[bool, int]:
-    for b in books:
-        if b.get("id") == book_id:
-            delay = 0
-            if isinstance(b.get("due_date"), str) and b["due_date"]:
-                try:
-                    due_dt = datetime.strptime(b["due_date"], "%Y-%m-%d")
-                    delay = max(0, (datetime.now() - due_dt).days)
-                except ValueError:
-                    delay = 0
-            b.update({"available": True, "borrower": None, "due_date": None, "borrowed_at": None})
-            if delay > 0: logging.warning("Gecikmeli iade: id=%s, delay=%s gün", book_id, delay)
-            else: logging.info("Zamanında iade: id=%s", book_id)
-            _assign_next_waiter(b)
-            return True, delay
-    raise NotFoundError(f"Kitap yok: id={book_id}")
+    b = _find_book(books, book_id)
+    if b is None: raise NotFoundError(f"Kitap yok: id={book_id}")
+    delay = 0
+    o = _due_ord(b)  # geçersiz tarih → gecikme yok
+    if o is not None:
+        delay = max(0, datetime.now().toordinal() - o)
+    b.update({"available": True, "borrower": None, "due_date": None, "borrowed_at": None})
+    if delay > 0: log.warning("Gecikmeli iade: id=%s, delay=%s gün", book_id, delay)
+    else: log.info("Zamanında iade: id=%s", book_id)
+    _assign_next_waiter(b)
+    return True, delay
 
 def calc_fee(delay_days: int, *, base: float=1.0, weekend_free: bool=True) -> float:
     if delay_days <= 0: return 0.0
     if not weekend_free: return round(delay_days * base, 2)
-    fee_days = 0; today = datetime.now().date()
-    for i in range(delay_days):
-        d = (today - timedelta(days=i+1))
-        if d.weekday() < 5: fee_days += 1
+    # Dünden geriye 'delay_days' günlük penceredeki hafta içi günler, gün gün dolaşmadan:
+    # tam haftalar 5'er gün, kalan (<7) gün pencerenin ilk gününün haftagününden sayılır.
+    full, rem = divmod(delay_days, 7)
+    wd = (datetime.now().toordinal() - delay_days - 1) % 7  # date.weekday(): ordinal 1 = pazartesi
+    fee_days = full * 5 + sum(1 for i in range(rem) if (wd + i) % 7 < 5)
     return round(fee_days * base, 2)
 
 def return_book_with_delay_fee(books: List[Dict], book_id: int, fee_per_day: float = 1.0) -> Tuple[bool, int, float]:
     ok, delay = return_book_with_delay(books, book_id)
     fee = calc_fee(delay, base=float(fee_per_day), weekend_free=True) if ok else 0.0
-    if ok: logging.info("İade ücreti: id=%s, delay=%s, fee=%.2f", book_id, delay, fee)
+    if ok: log.info("İade ücreti: id=%s, delay=%s, fee=%.2f", book_id, delay, fee)
     return ok, delay, fee
 
 def renew_book(books: List[Dict], book_id: int, extra_days: int = 7, *, max_total_days: int = 28) -> bool:
     if extra_days <= 0: raise ValidationError("extra_days>0 olmalı")
-    for b in books:
-        if b.get("id") == book_id:
-            if b.get("available"): return False
-            if not b.get("due_date"): return False
-            due = datetime.strptime(b["due_date"], "%Y-%m-%d")
-            if due < datetime.now():  # gecikmişken yenileme yok
-                return False
-            base_total = 14 + extra_days
-            if base_total > max_total_days:
-                return False
-            b["due_date"] = (due + timedelta(days=extra_days)).strftime("%Y-%m-%d")
-            logging.info("Yenileme: id=%s, +%s gün → %s", book_id, extra_days, b["due_date"])
-            return True
-    raise NotFoundError(f"Kitap yok: id={book_id}")
+    b = _find_book(books, book_id)
+    if b is None: raise NotFoundError(f"Kitap yok: id={book_id}")
+    if b.get("available"): return False
+    if not b.get("due_date"): return False
+    due = _parse_ymd_dt(b["due_date"])
+    if due < datetime.now():  # gecikmişken yenileme yok
+        return False
+    base_total = 14 + extra_days
+    if base_total > max_total_days:
+        return False
+    b["due_date"] = (due + timedelta(days=extra_days)).date().isoformat()
+    log.info("Yenileme: id=%s, +%s gün → %s", book_id, extra_days, b["due_date"])
+    return True
 
-def list_overdue_stats(books: List[Dict], today: Optional[str] = None, *, fee_per_day: float = 1.0) -> Tuple[List[Dict], int, float]:
-    if today is None: today = _today_str()
-    fmt = "%Y-%m-%d"
-    try: today_dt = datetime.strptime(today, fmt)
-    except ValueError: today_dt = datetime.now()
+def _overdue_py(books: List[Dict], today_ord: int, fee_per_day: float) -> Tuple[List[Dict], float]:
     out: List[Dict] = []; total_fee = 0.0
     for book in books:
         if book.get("available") is True: continue
-        due = book.get("due_date")
-        if not isinstance(due, str) or not due: continue
-        try: due_dt = datetime.strptime(due, fmt)
-        except ValueError: continue
-        if due_dt < today_dt:
-            out.append(book)
-            delay = (today_dt - due_dt).days
-            total_fee += calc_fee(delay, base=float(fee_per_day), weekend_free=True)
+        o = _due_ord(book)  # önbellekli tamsayı; kitap başına tarih ayrıştırma yok
+        if o is None or o >= today_ord: continue
+        out.append(book)
+        total_fee += calc_fee(today_ord - o, base=fee_per_day, weekend_free=True)
+    return out, total_fee
+
+_EPOCH_ORD = date(1970, 1, 1).toordinal()
+
+def _overdue_vec(books: List[Dict], today_dt: datetime, fee_per_day: float) -> Tuple[List[Dict], float]:
+    """SoA yolu: önbellekli gün sıra numaraları tek int64 dizisine alınır, filtre/ücret vektörel."""
+    pos: List[int] = []; ords: List[int] = []
+    for i, b in enumerate(books):
+        if b.get("available") is True: continue
+        o = _due_ord(b)  # geçersiz tarih None → saf yoldaki gibi atlanır
+        if o is not None: pos.append(i); ords.append(o)
+    if not ords: return [], 0.0
+    due_e = np.array(ords, dtype=np.int64) - _EPOCH_ORD  # 1970'ten beri gün
+    today_e = today_dt.toordinal() - _EPOCH_ORD
+    now_e = datetime.now().toordinal() - _EPOCH_ORD
+    kernel = _numba_kernel() if HAS_NUMBA else None
+    if kernel is not None:
+        mask, total_fee = kernel(due_e, today_e, now_e, fee_per_day)
+        return [books[pos[i]] for i in np.flatnonzero(mask)], float(total_fee)
+    delays = today_e - due_e
+    mask = delays > 0
+    # calc_fee(weekend_free=True) ile aynı: bugünden geriye 'delay' günlük penceredeki hafta içi günler
+    fee_days = np.busday_count((now_e - delays[mask]).astype("datetime64[D]"), np.datetime64(now_e, "D"))
+    total_fee = float(np.round(fee_days * fee_per_day, 2).sum())
+    return [books[pos[i]] for i in np.flatnonzero(mask)], total_fee
+
+def list_overdue_stats(books: List[Dict], today: Optional[str] = None, *, fee_per_day: float = 1.0) -> Tuple[List[Dict], int, float]:
+    if today is None: today = _today_str()
+    try: today_dt = _parse_ymd_dt(today)
+    except ValueError: today_dt = datetime.fromisoformat(_today_str())
+    res = None
+    if HAS_NUMPY and len(books) >= _VEC_MIN and _numpy_ready():
+        try: res = _overdue_vec(books, today_dt, float(fee_per_day))
+        except ValueError: res = None  # ayrıştırılamayan tarih → kitap kitap atlayan saf yola düş
+    out, total_fee = res or _overdue_py(books, today_dt.toordinal(), float(fee_per_day))
     total_fee = round(total_fee, 2)
-    logging.info("Overdue: %d kitap, toplam ücret=%.2f", len(out), total_fee)
+    log.info("Overdue: %d kitap, toplam ücret=%.2f", len(out), total_fee)
     return out, len(out), total_fee
 
 # ====== CSV import/export ======
+_CSV_FIELDS = ("id", "title", "author", "available", "borrower", "borrowed_at", "due_date")
+
 def export_to_csv(books: List[Dict], path: str) -> None:
-    fields = ["id", "title", "author", "available", "borrower", "borrowed_at", "due_date"]
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fields); w.writeheader()
-        for b in books:
-            w.writerow({k: b.get(k) for k in fields})
-    logging.info("CSV export: %s", path)
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        w = csv.writer(f); w.writerow(_CSV_FIELDS)
+        # satır başına ara dict yok; writerows demetleri C'de tüketir
+        w.writerows(tuple(map(b.get, _CSV_FIELDS)) for b in books)
+    log.info("CSV export: %s", path)
 
 def import_from_csv(books: List[Dict], path: str, *, title_col="title", author_col="author") -> int:
     if not os.path.exists(path): raise FileNotFoundError(path)
-    added = 0
-    with open(path, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
+    now = _now_iso()  # toplu eklemede tek zaman damgası
+    idx = _index(books, verify=True); seen: Set[Tuple[str, str]] = set(); rows: List[Tuple[str, str, Tuple[str, str]]] = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        r = csv.reader(f)  # satır başına dict yerine liste; kolon konumları başlıktan bir kez
+        header = next(r, None) or []
+        def col(name: str) -> int:  # DictReader gibi: aynı ad birden çok kez varsa sonuncusu
+            return len(header) - 1 - header[::-1].index(name) if name in header else -1
+        ti, ai = col(title_col), col(author_col)
         for row in r:
-            t = row.get(title_col) or ""
-            a = row.get(author_col) or ""
-            t, a = t.strip(), a.strip()
+            t = row[ti].strip() if 0 <= ti < len(row) else ""
+            a = row[ai].strip() if 0 <= ai < len(row) else ""
             if not t or not a: continue
-            try:
-                add_book_pro(books, t, a, disallow_duplicates=True)
-                added += 1
-            except DuplicateBookError:
-                continue
-    logging.info("CSV import: %s (eklenen=%s)", path, added)
+            t, a = titlecase_tr(t), sys.intern(titlecase_tr(a))
+            k = _dup_key(t, a)
+            if k in seen or idx.has_dup(k): continue  # dosya içi ve listedeki tekrarlar
+            seen.add(k); rows.append((t, a, k))
+    # Doğrulanan satırlar tek seferde: anahtarlar toplu normalize edilir, liste tek extend ile büyür
+    norms = norm_key_batch([f"{t} {a}" for t, a, _ in rows])
+    new = [_make_book(idx.max_id + i, t, a, now, n) for i, ((t, a, _), n) in enumerate(zip(rows, norms), 1)]
+    books.extend(new)
+    for b, (_, _, k) in zip(new, rows): idx.add(b, k)
+    added = len(new)
+    log.info("CSV import: %s (eklenen=%s)", path, added)  # satır başına değil, bir kez
     return added
 
 # ====== Görsel yardımcılar ======
@@ -368,42 +879,67 @@ def _format_status(b: Dict, *, compact: bool = True) -> str:
     borrower = b.get("borrower") or "bilinmiyor"; due = b.get("due_date") or "-"
     return f"Müsait değil — {borrower} (teslim: {due})"
 
-def _due_is_over(b: Dict, today: Optional[str] = None) -> bool:
+# Kısa durum yalnızca 'available'a bağlı → hap/renkli metin bir kez kurulur, satır başına birleştirilmez
+_STATUS_PILL = {True: "[pill_av] Müsait [/pill_av]", False: "[pill_na] Müsait değil [/pill_na]"}
+_STATUS_ANSI = {True: f"{ANSI_GREEN}Müsait{ANSI_RESET}", False: f"{ANSI_RED}Müsait değil{ANSI_RESET}"}
+
+# today_dt: çağıran döngü başına bir kez datetime.now() hesaplayıp geçirebilir (satır başına değil).
+def _due_days_from(b: Dict, T: datetime) -> Optional[int]:
+    """(strptime(due_date) - T).days ile aynı; önbellekli gün sıra numarasıyla. Boş/geçersiz tarih → None."""
+    o = _due_ord(b)
+    if o is None: return None
+    # teslim gece yarısıdır; T gün içinde bir saat ise fark bir gün aşağı yuvarlanır
+    return o - T.toordinal() - (1 if (T.hour or T.minute or T.second or T.microsecond) else 0)
+
+def _due_is_over(b: Dict, today: Optional[str] = None, *, today_dt: Optional[datetime] = None) -> bool:
     if b.get("available") is True: return False
-    d = b.get("due_date"); fmt = "%Y-%m-%d"
-    if not isinstance(d, str) or not d: return False
-    try: dd = datetime.strptime(d, fmt)
-    except ValueError: return False
-    T = datetime.strptime(today, fmt) if today else datetime.now()
-    return dd < T
-
-def _due_is_soon(b: Dict, days: int = 2) -> bool:
+    T = today_dt or (_parse_ymd_dt(today) if today else datetime.now())
+    delta = _due_days_from(b, T)
+    return delta is not None and delta < 0
+
+def _due_is_soon(b: Dict, days: int = 2, *, today_dt: Optional[datetime] = None) -> bool:
     if b.get("available") is True: return False
-    d = b.get("due_date")
-    if not isinstance(d, str) or not d: return False
-    try:
-        dd = datetime.strptime(d, "%Y-%m-%d")
-    except ValueError:
-        return False
-    return 0 <= (dd - datetime.now()).days <= days
+    delta = _due_days_from(b, today_dt or datetime.now())
+    return delta is not None and 0 <= delta <= days
 
-def _is_new(b: Dict) -> bool:
+def _is_new(b: Dict, *, today_dt: Optional[datetime] = None) -> bool:
     ca = b.get("created_at")
     if not isinstance(ca, str): return False
-    try: dt = datetime.strptime(ca[:19], "%Y-%m-%dT%H:%M:%S")
-    except ValueError: return False
-    return (datetime.now() - dt).total_seconds() <= 24*3600
-
-def _counts(books: List[Dict]) -> Tuple[int, int, int, int]:
-    total = len(books); available = sum(1 for b in books if b.get("available") is True)
-    borrowed = total - available; overdue = sum(1 for b in books if _due_is_over(b))
-    return total, available, borrowed, overdue
-
-def _compute_widths():
-    """Konsol genişliğine göre dinamik kolon genişlikleri."""
-    if not HAS_RICH or not console:  # fallback varsayılanlar
+    # (created_at, epoch saniye) — her çizimde yeniden ayrıştırılmaz; sayı olduğu için kitap JSON'a yazılabilir kalır
+    c = b.get("_created_ts")
+    if c is None or c[0] != ca:
+        s = ca[:19]
+        try:
+            fast = len(s) == 19 and s[4] == "-" and s[7] == "-" and s[10] == "T" and s[13] == ":" and s[16] == ":"
+            dt = datetime.fromisoformat(s) if fast else datetime.strptime(s, "%Y-%m-%dT%H:%M:%S")
+            ts: Optional[float] = dt.timestamp()
+        except (ValueError, OverflowError, OSError):
+            ts = None
+        b["_created_ts"] = c = (ca, ts)
+    if c[1] is None: return False
+    now = today_dt.timestamp() if today_dt else time.time()
+    return now - c[1] <= 24*3600
+
+def _counts(books: List[Dict], *, today_dt: Optional[datetime] = None) -> Tuple[int, int, int, int]:
+    now = today_dt or datetime.now()
+    # Sayımlar her çağrıda veriden: 'available' dışarıdan değiştirilse de tutarlı kalır
+    total = available = overdue = 0
+    for b in books:  # tek geçiş: müsait olan gecikmiş sayılmaz, ayrı kontrol gerekmez
+        total += 1
+        if b.get("available") is True: available += 1
+        elif _due_is_over(b, today_dt=now): overdue += 1
+    return total, available, total - available, overdue
+
+def _compute_widths() -> Dict[str, int]:
+    """Konsol genişliğine göre dinamik kolon genişlikleri (genişlik başına bir kez hesaplanır)."""
+    return _widths_for(console.width if _rich_ready() and console else 0)
+
+@functools.lru_cache(maxsize=8)
+def _widths_for(width: int) -> Dict[str, int]:
+    # Dönen sözlük paylaşılır; çağıranlar yalnızca okur
+    if not width:  # fallback varsayılanlar
         return dict(W_ID=4, W_DURUM=14, W_ALAN=14, W_ALDIGI=12, W_TESLIM=12, W_BEK=10, W_TITLE=32, W_AUTHOR=20)
-    C = max(80, console.width)  # güvenli alt sınır
+    C = max(80, width)  # güvenli alt sınır
     W_ID, W_DURUM, W_ALAN, W_ALDIGI, W_TESLIM, W_BEK = 4, 14, 14, 12, 12, 10
     fixed = W_ID + W_DURUM + W_ALAN + W_ALDIGI + W_TESLIM + W_BEK
     overhead = 10  # kenarlık/padding tahmini
@@ -413,13 +949,58 @@ def _compute_widths():
     return dict(W_ID=W_ID, W_DURUM=W_DURUM, W_ALAN=W_ALAN, W_ALDIGI=W_ALDIGI,
                 W_TESLIM=W_TESLIM, W_BEK=W_BEK, W_TITLE=W_TITLE, W_AUTHOR=W_AUTHOR)
 
-def print_inventory(books: List[Dict]) -> None:
+def _inventory_table(w: Dict[str, int]) -> "Table":
+    table = Table(box=ROUNDED, show_lines=False, header_style="hdr", row_styles=["", "dim"], expand=True, padding=(0,1))
+    table.add_column("ID", justify="right", width=w["W_ID"], no_wrap=True)
+    table.add_column("Başlık", justify="left", min_width=w["W_TITLE"], max_width=w["W_TITLE"], overflow="fold")
+    table.add_column("Yazar", justify="left", min_width=w["W_AUTHOR"], max_width=w["W_AUTHOR"], overflow="fold")
+    table.add_column("Durum", justify="center", width=w["W_DURUM"], no_wrap=True)
+    table.add_column("Alan", justify="left", width=w["W_ALAN"], no_wrap=True)
+    table.add_column("Aldığı", justify="left", width=w["W_ALDIGI"], no_wrap=True)
+    table.add_column("Teslim", justify="left", width=w["W_TESLIM"], no_wrap=True)
+    table.add_column("Bekleyen", justify="right", width=w["W_BEK"], no_wrap=True)
+    return table
+
+def _inventory_row(b: Dict, now: datetime) -> Tuple[str, ...]:
+    av = b.get("available")  # satır başına alanları bir kez oku
+    status_pill = _STATUS_PILL[bool(av)]
+    due = (b.get("due_date") or "-")
+    if not av:
+        if _due_is_over(b, today_dt=now): due = f"[warn]{due}[/warn]"
+        elif _due_is_soon(b, today_dt=now): due = f"[warn]{due}[/warn]"
+    new_badge = " 🆕" if _is_new(b, today_dt=now) else ""
+    return (str(b.get("id") or ""), (b.get("title") or "") + new_badge, b.get("author") or "", status_pill,
+            b.get("borrower") or "-", b.get("borrowed_at") or "-", due, str(len(b.get("waitlist") or [])))
+
+def _inventory_line(b: Dict, now: datetime) -> str:
+    av = b.get("available")
+    bid = b.get("id"); title = b.get("title") or ""; author = b.get("author") or ""
+    status_col = _STATUS_ANSI[bool(av)]
+    borrower = b.get("borrower") or "-"
+    borrowed_at = b.get("borrowed_at") or "-"
+    due = b.get("due_date") or "-"
+    if not av and (_due_is_over(b, today_dt=now) or _due_is_soon(b, today_dt=now)):
+        due = f"{ANSI_YELLOW}{due}{ANSI_RESET}"
+    new_badge = " 🆕" if _is_new(b, today_dt=now) else ""
+    wl_count = len(b.get("waitlist") or [])
+    return f"[{bid:>3}] {title}{new_badge} — {author} | {status_col} | Alan:{borrower} | Aldığı:{borrowed_at} | Teslim:{due} | Bekleyen:{wl_count}"
+
+def print_inventory(books: List[Dict], *, ordered: Optional[List[Dict]] = None, limit: Optional[int] = None,
+                    page: int = 0, page_size: Optional[int] = None) -> None:
     if not books:
         print("\n📚 Envanter boş."); return
-    ordered = sorted(books, key=lambda b: (str(b.get("title") or "").lower(),))
-    if HAS_RICH:
-        w = _compute_widths()
-        total, available, borrowed, overdue = _counts(ordered)
+    if ordered is None: ordered = _sorted_by_title(books)  # önceden sıralanmış liste verilebilir
+    if page_size:  # sayfalı: yalnızca istenen dilim çizilir
+        pages = -(-len(ordered) // page_size); page = min(max(page, 0), pages - 1)
+        shown = ordered[page * page_size:(page + 1) * page_size]
+        note = f"Sayfa {page + 1}/{pages}" if pages > 1 else ""
+    else:
+        shown = ordered[:limit] if limit is not None else ordered  # büyük listede yalnızca baş kısım çizilir
+        more = len(ordered) - len(shown)
+        note = f"… {more} kitap daha (tümü için 't')" if more else ""
+    now = datetime.now()  # tüm satırlar için tek zaman damgası
+    if _rich_ready():
+        total, available, borrowed, overdue = _counts(books, today_dt=now)
         console.print(Panel.fit(Text("📚 Pro Kütüphane — Envanter", style="title"), border_style="accent", box=ROUNDED))
         cards = [
             Panel(Text.from_markup(f"Toplam\n[b]{total}[/b]", justify="center"), title="📦", border_style="muted", box=ROUNDED),
@@ -428,54 +1009,35 @@ def print_inventory(books: List[Dict]) -> None:
             Panel(Text.from_markup(f"Geciken\n[b]{overdue}[/b]", justify="center"), title="⏰", border_style="warn", box=ROUNDED),
         ]
         console.print(Columns(cards, expand=True))
-        table = Table(box=ROUNDED, show_lines=False, header_style="hdr", row_styles=["", "dim"], expand=True, padding=(0,1))
-        table.add_column("ID", justify="right", width=w["W_ID"], no_wrap=True)
-        table.add_column("Başlık", justify="left", min_width=w["W_TITLE"], max_width=w["W_TITLE"], overflow="fold")
-        table.add_column("Yazar", justify="left", min_width=w["W_AUTHOR"], max_width=w["W_AUTHOR"], overflow="fold")
-        table.add_column("Durum", justify="center", width=w["W_DURUM"], no_wrap=True)
-        table.add_column("Alan", justify="left", width=w["W_ALAN"], no_wrap=True)
-        table.add_column("Aldığı", justify="left", width=w["W_ALDIGI"], no_wrap=True)
-        table.add_column("Teslim", justify="left", width=w["W_TESLIM"], no_wrap=True)
-        table.add_column("Bekleyen", justify="right", width=w["W_BEK"], no_wrap=True)
-        for b in ordered:
-            bid = str(b.get("id") or "")
-            title = b.get("title") or ""
-            author = b.get("author") or ""
-            status_txt = _format_status(b, compact=True)
-            status_pill = f"[pill_av] {status_txt} [/pill_av]" if b.get("available") else f"[pill_na] {status_txt} [/pill_na]"
-            borrower = (b.get("borrower") or "-")
-            borrowed_at = (b.get("borrowed_at") or "-")
-            due = (b.get("due_date") or "-")
-            if not b.get("available"):
-                if _due_is_over(b): due = f"[warn]{due}[/warn]"
-                elif _due_is_soon(b): due = f"[warn]{due}[/warn]"
-            new_badge = " 🆕" if _is_new(b) else ""
-            wl_count = len(b.get("waitlist") or [])
-            table.add_row(bid, title + new_badge, author, status_pill, borrower, borrowed_at, due, str(wl_count))
-        console.print(table); return
+        table = _inventory_table(_compute_widths())
+        for b in shown: table.add_row(*_inventory_row(b, now))
+        console.print(table)
+        if note: console.print(Text(note, style="muted"))
+        return
     # Fallback (Rich yoksa)
     print("\n📚 Mevcut Kitaplar"); print("─"*120)
-    for b in ordered:
-        bid = b.get("id"); title = b.get("title") or ""; author = b.get("author") or ""
-        status_plain = _format_status(b, compact=True)
-        status_col = f"{ANSI_GREEN}{status_plain}{ANSI_RESET}" if b.get("available") else f"{ANSI_RED}{status_plain}{ANSI_RESET}"
-        borrower = b.get("borrower") or "-"
-        borrowed_at = b.get("borrowed_at") or "-"
-        due = b.get("due_date") or "-"
-        if not b.get("available") and (_due_is_over(b) or _due_is_soon(b)):
-            due = f"{ANSI_YELLOW}{due}{ANSI_RESET}"
-        new_badge = " 🆕" if _is_new(b) else ""
-        wl_count = len(b.get("waitlist") or [])
-        print(f"[{bid:>3}] {title}{new_badge} — {author} | {status_col} | Alan:{borrower} | Aldığı:{borrowed_at} | Teslim:{due} | Bekleyen:{wl_count}")
+    for b in shown: print(_inventory_line(b, now))
+    if note: print(note)
     print("─"*120); print(f"Toplam: {len(books)} kitap")
 
+def print_inventory_row(books: List[Dict], book_id: int) -> None:
+    """Değişiklikten sonra tüm envanter yerine yalnızca etkilenen kitabın satırını çizer."""
+    b = _find_book(books, book_id)
+    if b is None: return
+    now = datetime.now()
+    if _rich_ready():
+        table = _inventory_table(_compute_widths())
+        table.add_row(*_inventory_row(b, now)); console.print(table)
+    else:
+        print(_inventory_line(b, now))
+
 def print_available_only(books: List[Dict]) -> None:
     """Sadece şu anda MÜSAİT olan kitapları kompakt listeler."""
     avail = [b for b in books if b.get("available") is True]
     if not avail:
         print("\n✅ Şu anda müsait kitap yok."); return
-    avail.sort(key=lambda b: (str(b.get("title") or "").lower(),))
-    if HAS_RICH:
+    avail = _sorted_by_title(avail)
+    if _rich_ready():
         w = _compute_widths()
         # Bu görünümde yalnızca ID, Başlık, Yazar ve Durum kolonlarını gösteriyoruz.
         table = Table(box=ROUNDED, show_lines=False, header_style="hdr", row_styles=["", "dim"], expand=True, padding=(0,1))
@@ -504,7 +1066,7 @@ def seed_books_initial() -> List[Dict]:
     # 1984 ödünçte + gecikmiş örnek: due= -2 gün, borrowed_at ~14 gün önce
     for b in books:
         if b["title"] == "1984":
-            due = datetime.strptime(_in_days_str(-2), "%Y-%m-%d")
+            due = datetime.fromisoformat(_in_days_str(-2))
             borrowed_at = (due - timedelta(days=14)).strftime("%Y-%m-%d")
             b.update({
                 "available": False,
@@ -520,204 +1082,346 @@ def load_or_seed_demo(path: str = "books_pro.json", *, force_seed: bool = False,
     books: List[Dict] = []
     if not force_seed and os.path.exists(path):
         books = load_from_file_safe(path)
-        if books: return books
+        if books: _replay_log(books, path); return books
     books = seed_books_initial()
     if save_if_seed: save_to_file_meta(books, path, with_meta=True)
     return books
 
-def _autosave(books: List[Dict], persist_path: Optional[str]) -> None:
-    if not persist_path: return
-    if HAS_RICH:
+def _write_now(books: List[Dict], persist_path: str, *, pretty: bool = False, verbose: bool = True) -> None:
+    if _rich_ready() and verbose:
         with Progress(SpinnerColumn(style="accent"), TextColumn("[accent]Kaydediliyor...[/accent]"),
                       transient=True, console=console) as progress:
             progress.add_task("save", total=None)
-            save_to_file_meta(books, persist_path, with_meta=True)
-        console.print("[ok]✓ Kaydedildi.[/ok]")
+            save_to_file_meta(books, persist_path, with_meta=True, pretty=pretty, fmt=_SAVE_FMT)
     else:
-        save_to_file_meta(books, persist_path, with_meta=True)
-        print("✓ Kaydedildi.")
+        save_to_file_meta(books, persist_path, with_meta=True, pretty=pretty, fmt=_SAVE_FMT)
+    if verbose: _ok("✓ Kaydedildi.")
+
+# ====== Ertelenmiş (debounce) kayıt ======
+# Her değişiklik dosyayı baştan yazmaz: kayıt 'kirli' işaretlenir, _SAVE_DELAY sonra tek seferde
+# yazılır. 'k'/'q' ve çıkış (atexit) bekleyen kaydı hemen yazar. Yazımı tek bir arka plan iş
+# parçacığı yapar (kayıt başına yeni Timer açılmaz); kilit sayesinde arka plan ile ana iş
+# parçacığı eski bir anlık görüntüyü yenisinin üstüne yazamaz.
+_SAVE_DELAY = 0.5
+_SAVE_FMT = "json"  # CLI kayıt biçimi (main(fmt=...)); yükleme biçimi dosyadan tanınır
+# Otomatik kayıt kipi (main(autosave=...)):
+#   always  — değişiklik günlüğü + ertelenmiş tam kayıt (varsayılan)
+#   on_quit — oturum boyunca diske yazılmaz; 'q'/çıkışta tek tam kayıt (toplu CSV içe aktarımı için önerilir)
+#   off     — yalnızca açık 'k' komutu yazar
+_AUTOSAVE: Literal["always", "on_quit", "off"] = "always"
+_save_lock = threading.Lock()
+_pending: Dict = {"books": None, "path": None, "pretty": False}
+_dirty = False
+_unsaved = False  # 'off' kipinde diske yazılmamış değişiklik var mı (yükleme/çıkışta uyarı için)
+_wake = threading.Event()  # kirli kayıt → yazıcıyı uyandır
+_writer: Optional[threading.Thread] = None
+_COMPACT_EVERY = 50  # bu kadar günlük satırından sonra tam kayıtla sıkıştır
+_log_ops = 0
+
+def _flush(*, verbose: bool = False) -> bool:
+    """Bekleyen kaydı hemen yazar; yazılacak bir şey yoksa False döner."""
+    global _dirty, _log_ops, _unsaved
+    with _save_lock:
+        if not _dirty or not _pending["path"]: return False
+        state = (_dirty, _log_ops, _unsaved)
+        _dirty = False; _log_ops = 0; _unsaved = False
+        try:
+            # Liste tek C çağrısıyla kopyalanır (arada append/silme görülmez); kitaplar ise tek tek
+            # kopyalanır, bu sırada ana iş parçacığında yapılan değişiklik kaydı yeniden kirletir
+            snapshot = [dict(b) for b in list(_pending["books"])]
+            _write_now(snapshot, _pending["path"], pretty=_pending["pretty"], verbose=verbose)
+        except BaseException:
+            _dirty, _log_ops, _unsaved = state  # yazılamadı → kayıt bekliyor kalır ('q'/atexit yeniden dener)
+            raise
+    return True
+
+def _writer_loop() -> None:
+    while True:
+        _wake.wait(); _wake.clear()
+        time.sleep(_SAVE_DELAY)  # bu aralıktaki değişiklikler tek yazımda birleşir
+        try: _flush()
+        except Exception: log.exception("Arka plan kaydı başarısız")  # yazıcı ölmesin; atexit yine dener
+
+def _autosave(books: List[Dict], persist_path: Optional[str], *, pretty: bool = False) -> None:
+    # Otomatik kayıt kompakt yazar; girintili çıktı yalnızca kullanıcının açık 'kaydet' komutunda
+    global _dirty, _writer
+    if not persist_path: return
+    with _save_lock:
+        _pending.update(books=books, path=persist_path, pretty=pretty); _dirty = True
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="autosave", daemon=True); _writer.start()
+    _wake.set()
+
+def _log_change(books: List[Dict], persist_path: Optional[str], book: Optional[Dict]) -> None:
+    """Tek kitaplık değişikliği günlüğe ekler; tam kayıt çıkışta ya da _COMPACT_EVERY satırda bir yapılır."""
+    global _dirty, _log_ops, _unsaved
+    if not persist_path: return
+    if _AUTOSAVE == "off": _unsaved = True; return  # yalnızca 'k' yazar; yükleme/çıkış uyarır
+    if _AUTOSAVE == "on_quit":  # yalnızca kirli işaretlenir; yazım _flush'ta (q/atexit)
+        with _save_lock: _pending.update(books=books, path=persist_path, pretty=False); _dirty = True
+        return
+    if book is None: _autosave(books, persist_path); return
+    with _save_lock:
+        _append_event(persist_path, book)
+        _pending.update(books=books, path=persist_path, pretty=False); _dirty = True
+        _log_ops += 1; compact = _log_ops >= _COMPACT_EVERY
+    if compact: _autosave(books, persist_path)
+
+atexit.register(_flush)
+
+def _search_row(b: Dict, pat: Optional["re.Pattern[str]"]) -> Tuple:
+    """Arama tablosu için tek satır: (id, vurgulu başlık, vurgulu yazar, durum hapı)."""
+    t = Text(b.get("title") or ""); a_txt = Text(b.get("author") or "")
+    if pat is not None:
+        t.highlight_regex(pat, style="warn"); a_txt.highlight_regex(pat, style="warn")
+    return str(b.get("id") or ""), t, a_txt, _STATUS_PILL[bool(b.get("available"))]
 
 # ====== CLI ======
+_BULK_LIMIT = 50  # toplu yükleme/içe aktarma sonrası çizilecek satır sayısı
+_PAGE_SIZE = 50   # 't' komutunda sayfa başına satır
+# Betikle (pipe) çalıştırmada stdin tek seferde okunur; her input() ayrı okuma yapmaz
+_STDIN_LINES: Optional[Iterator[str]] = None
+
+def _ask(prompt: str = "") -> str:
+    if _STDIN_LINES is None: return input(prompt)
+    sys.stdout.write(prompt)
+    line = next(_STDIN_LINES, None)
+    if line is None: raise EOFError  # input() ile aynı: girdi bitti
+    return line
+
+# Sayı girdileri önce ucuz bir biçim kontrolünden geçer; hatalı girdide istisna yerine None döner
+_BAD_NUMBER = "Hata: geçerli bir sayı girin."
+_FLOAT_RE = re.compile(r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?")
+
+def _ask_int(prompt: str, default: Optional[int] = None) -> Optional[int]:
+    s = _ask(prompt).strip()
+    if not s: return default
+    digits = s[1:] if s[0] in "+-" else s
+    return int(s) if digits.isascii() and digits.isdigit() else None
+
+def _ask_float(prompt: str, default: Optional[float] = None) -> Optional[float]:
+    s = _ask(prompt).strip()
+    if not s: return default
+    return float(s) if _FLOAT_RE.fullmatch(s) else None
+
 def _print_banner():
-    if HAS_RICH:
+    if _rich_ready():
         console.print(Panel.fit(Text("📚 Pro Kütüphane — JSON", style="title"), border_style="accent", box=ROUNDED))
     else:
         print("\n📚 Pro Kütüphane — JSON")
 
+_MENU_ITEMS = (
+    ("t", "tüm liste"), ("s", "sadece müsaitler"),  # ✅ yeni
+    ("a", "ara"), ("e", "ekle"),
+    ("b", "ödünç ver"), ("w", "waitlist'e ekle"),
+    ("r", "yenile (renew)"), ("o", "overdue"),
+    ("i", "iade (ücretli)"),
+    ("x", "CSV dışa aktar"), ("m", "CSV içe aktar"),
+    ("k", "kaydet"), ("y", "yükle"), ("u", "günlük ücret"), ("q", "çıkış"),
+)
+_MENU_PLAIN = " | ".join(f"{k}={v}" for k, v in _MENU_ITEMS)  # menü sabit: bir kez birleştirilir
+
+@functools.lru_cache(maxsize=None)
+def _menu_panel() -> "Panel":
+    return Panel("  ".join(f"[accent]{k}[/accent]={v}" for k, v in _MENU_ITEMS), border_style="muted", box=ROUNDED)
+
 def _print_menu():
-    items = [
-        ("t", "tüm liste"), ("s", "sadece müsaitler"),  # ✅ yeni
-        ("a", "ara"), ("e", "ekle"),
-        ("b", "ödünç ver"), ("w", "waitlist'e ekle"),
-        ("r", "yenile (renew)"), ("o", "overdue"),
-        ("i", "iade (ücretli)"),
-        ("x", "CSV dışa aktar"), ("m", "CSV içe aktar"),
-        ("k", "kaydet"), ("y", "yükle"), ("u", "günlük ücret"), ("q", "çıkış"),
-    ]
-    if HAS_RICH:
-        txt = "  ".join(f"[accent]{k}[/accent]={v}" for k, v in items)
-        console.print(Panel(txt, border_style="muted", box=ROUNDED))
+    if _rich_ready(): console.print(_menu_panel())
+    else: print(_MENU_PLAIN)
+
+class _Session:
+    """Etkileşimli oturum durumu; komut işleyicileri bunu paylaşır."""
+    __slots__ = ("books", "persist_path", "verbose", "fee_per_day")
+
+    def __init__(self, books: List[Dict], persist_path: Optional[str], verbose: bool):
+        self.books = books; self.persist_path = persist_path; self.verbose = verbose
+        self.fee_per_day = 1.5
+
+    def show_row(self, bid: int) -> None:  # verbose: eskisi gibi tüm envanter
+        if self.verbose: print_inventory(self.books)
+        else: print_inventory_row(self.books, bid)
+
+    def log_change(self, bid: int) -> None:
+        _log_change(self.books, self.persist_path, _find_book(self.books, bid))
+
+# ====== Komut işleyicileri ======
+# Her komut ayrı bir işlevdir; main() yalnızca sözlükten seçer. True dönen işleyici döngüyü bitirir.
+def _cmd_list(s: _Session) -> None:
+    books = s.books
+    if len(books) > _PAGE_SIZE:  # küçük envanterde sayfa sorulmaz
+        pg = _ask_int(f"Sayfa (1-{-(-len(books) // _PAGE_SIZE)}, boş=1): ", 1)
+        if pg is None: _err(_BAD_NUMBER); return
+        print_inventory(books, page=pg - 1, page_size=_PAGE_SIZE)
+    else:
+        print_inventory(books)
+
+def _cmd_available(s: _Session) -> None:  # ✅ sadece müsaitler
+    print_available_only(s.books)
+
+def _cmd_search(s: _Session) -> None:
+    q = _ask("Arama: ").strip()
+    mode = (_ask("Mod (any/all/prefix): ").strip().lower() or "any")
+    if mode not in {"any", "all", "prefix"}: mode = "any"
+    res = search_books_adv(s.books, q, mode=mode, normalize=True)
+    toks = sorted(set((norm_key(q) or "").split()), key=len, reverse=True)  # uzun token önce eşleşsin
+    # Tüm tokenlar tek alternasyon deseninde: satır başına token sayısı kadar değil, tek tarama
+    pat = _compile("|".join(map(re.escape, toks)), re.IGNORECASE) if toks else None
+    if _rich_ready():
+        table = Table(box=ROUNDED, show_lines=False, header_style="hdr",
+                      row_styles=["","dim"], expand=True, padding=(0,1))
+        widths = _compute_widths()
+        table.add_column("ID", justify="right", width=widths["W_ID"], no_wrap=True)
+        table.add_column("Başlık", justify="left", min_width=widths["W_TITLE"], max_width=widths["W_TITLE"], overflow="fold")
+        table.add_column("Yazar", justify="left", min_width=widths["W_AUTHOR"], max_width=widths["W_AUTHOR"], overflow="fold")
+        table.add_column("Durum", justify="center", width=widths["W_DURUM"], no_wrap=True)
+        rows = [_search_row(b, pat) for b in res]  # önce tüm satırlar, sonra tabloya
+        for row in rows: table.add_row(*row)
+        console.print(table)
+        console.print(Text(f"{len(res)} sonuç", style="muted"))
     else:
-        print(" | ".join(f"{k}={v}" for k, v in items))
+        print(f"{len(res)} sonuç:")
+        def hi(text: str) -> str:
+            return pat.sub(lambda m: ANSI_YELLOW + m.group(0) + ANSI_RESET, text) if pat else text
+        if res: print("\n".join(f" - {hi(b.get('title') or '')} — {hi(b.get('author') or '')}" for b in res))
 
-def main(seed: bool = True, persist_path: Optional[str] = "books_pro.json"):
+def _cmd_add(s: _Session) -> None:
+    t = _ask("Başlık: ").strip(); a = _ask("Yazar: ").strip()
+    nb = add_book_pro(s.books, t, a, disallow_duplicates=True)
+    _ok("✓ Eklendi.")
+    _log_change(s.books, s.persist_path, nb); s.show_row(nb["id"])
+
+def _cmd_borrow(s: _Session) -> None:
+    bid = _ask_int("Ödünç verilecek ID: ")
+    if bid is None: _err(_BAD_NUMBER); return
+    user = _ask("Kullanıcı adı: ").strip()
+    days = _ask_int("Gün sayısı (örn 14): ", 14)
+    if days is None: _err(_BAD_NUMBER); return
+    if borrow_book_safe(s.books, bid, user, days=days):
+        _ok("✓ Ödünç verildi.")
+        s.log_change(bid); s.show_row(bid)
+    else:
+        _err("Verilemedi (kitap yok ya da zaten ödünçte). Waitlist'e eklemeyi deneyin (w).")
+
+def _cmd_waitlist(s: _Session) -> None:
+    bid = _ask_int("Waitlist ID: ")
+    if bid is None: _err(_BAD_NUMBER); return
+    user = _ask("Kullanıcı adı: ").strip()
+    if join_waitlist(s.books, bid, user):
+        _ok("✓ Waitlist'e eklendi.")
+        s.log_change(bid)
+    else:
+        _err("Eklenemedi.")
+    s.show_row(bid)
+
+def _cmd_renew(s: _Session) -> None:
+    bid = _ask_int("Yenilenecek ID: ")
+    if bid is None: _err(_BAD_NUMBER); return
+    extra = _ask_int("Ek gün (örn 7): ", 7)
+    if extra is None: _err(_BAD_NUMBER); return
+    if renew_book(s.books, bid, extra_days=extra, max_total_days=28):
+        _ok("✓ Yenilendi.")
+        s.log_change(bid)
+    else:
+        _err("Yenilenemedi.")
+    s.show_row(bid)
+
+def _cmd_overdue(s: _Session) -> None:
+    lst, n, fee = list_overdue_stats(s.books, today=_today_str(), fee_per_day=s.fee_per_day)
+    _warn(f"Geciken {n} kitap (tahmini ücret={fee:.2f}): {[b.get('title') for b in lst]}")
+
+def _cmd_return(s: _Session) -> None:
+    bid = _ask_int("İade edilecek ID: ")
+    if bid is None: _err(_BAD_NUMBER); return
+    ok, delay, fee = return_book_with_delay_fee(s.books, bid, fee_per_day=s.fee_per_day)
+    if ok:
+        _say(f"[ok]✓ İade.[/ok] Gecikme={delay} gün, Ücret={fee:.2f}")
+        s.log_change(bid); s.show_row(bid)
+    else:
+        _err("Bulunamadı.")
+
+def _cmd_export(s: _Session) -> None:
+    path = _ask("CSV yol (örn export.csv): ").strip() or "export.csv"
+    export_to_csv(s.books, path)
+    _ok("✓ Dışa aktarıldı.")
+
+def _cmd_import(s: _Session) -> None:
+    path = _ask("CSV yol (örn import.csv): ").strip() or "import.csv"
+    n = import_from_csv(s.books, path)
+    _ok(f"✓ İçe aktarıldı (eklenen={n}).")
+    if n: _log_change(s.books, s.persist_path, None)  # tam kayıt (kip izin veriyorsa)
+    print_inventory(s.books, limit=None if s.verbose else _BULK_LIMIT)
+
+def _cmd_save(s: _Session) -> None:
+    _autosave(s.books, s.persist_path, pretty=True); _flush(verbose=True)
+
+def _cmd_reload(s: _Session) -> None:
+    global _unsaved
+    books = s.books; path = s.persist_path or "books_pro.json"
+    if _unsaved: _warn("⚠ Kaydedilmemiş değişiklikler atılıyor (autosave=off; kaydetmek için 'k').")
+    _unsaved = False
+    _flush()  # bekleyen kayıt (örn. CSV içe aktarımı) önce diske; yoksa eski dosya onu siler
+    loaded = load_from_file_safe(path, on_missing=print)
+    with _save_lock: books[:] = loaded  # yazıcı yarım (boşaltılmış) listeyi göremez
+    _rebuild_indexes(books); _replay_log(books, path)
+    _ok(f"✓ Yüklendi. Toplam: {len(books)}")
+    print_inventory(books, limit=None if s.verbose else _BULK_LIMIT)
+
+def _cmd_fee(s: _Session) -> None:
+    fee = _ask_float("Günlük ücret (örn 1.5): ")
+    if fee is None: _err(_BAD_NUMBER); return
+    s.fee_per_day = fee
+    _ok(f"✓ Güncellendi: {s.fee_per_day:.2f}")
+
+def _cmd_quit(s: _Session) -> bool:
+    _flush(verbose=True)  # yalnızca kaydedilmemiş değişiklik varsa yazar
+    if _unsaved: _warn("⚠ Kaydedilmemiş değişiklikler diske yazılmadı (autosave=off).")
+    _muted("Görüşürüz! 👋")
+    return True
+
+_HANDLERS: Dict[str, Callable[[_Session], Optional[bool]]] = {
+    "t": _cmd_list, "s": _cmd_available, "a": _cmd_search, "e": _cmd_add, "b": _cmd_borrow,
+    "w": _cmd_waitlist, "r": _cmd_renew, "o": _cmd_overdue, "i": _cmd_return, "x": _cmd_export,
+    "m": _cmd_import, "k": _cmd_save, "y": _cmd_reload, "u": _cmd_fee, "q": _cmd_quit,
+}
+
+def _cmd_unknown(s: _Session) -> None:
+    _muted("Komut: " + "/".join(_HANDLERS))
+
+def main(seed: bool = True, persist_path: Optional[str] = "books_pro.json", *, verbose: bool = False,
+         fmt: Literal["json", "msgpack"] = "json", autosave: Literal["always", "on_quit", "off"] = "always"):
+    global _STDIN_LINES, _SAVE_FMT, _AUTOSAVE
+    if fmt == "msgpack" and not HAS_MSGPACK: raise ValueError("msgpack biçimi için 'msgpack' paketi gerekli")
+    _SAVE_FMT = fmt; _AUTOSAVE = autosave
     setup_logging(level=logging.INFO)
+    _rich_ready()  # etkileşimli arayüz: Rich (varsa) burada yüklenir
+    if not sys.stdin.isatty(): _STDIN_LINES = iter(sys.stdin.read().splitlines())
     books: List[Dict] = load_or_seed_demo(persist_path, force_seed=False, save_if_seed=True) if seed and persist_path else []
     _print_banner(); print_inventory(books)
 
-    fee_per_day = 1.5
+    session = _Session(books, persist_path, verbose)
     while True:
         _print_menu()
-        cmd = input("> ").strip().lower()
+        cmd = _ask("> ").strip().lower()
         try:
-            if cmd == "t":
-                print_inventory(books)
-
-            elif cmd == "s":  # ✅ sadece müsaitler
-                print_available_only(books)
-
-            elif cmd == "a":
-                q = input("Arama: ").strip()
-                mode = (input("Mod (any/all/prefix): ").strip().lower() or "any")
-                if mode not in {"any", "all", "prefix"}: mode = "any"
-                res = search_books_adv(books, q, mode=mode, normalize=True)
-                if HAS_RICH:
-                    table = Table(box=ROUNDED, show_lines=False, header_style="hdr",
-                                  row_styles=["","dim"], expand=True, padding=(0,1))
-                    widths = _compute_widths()
-                    table.add_column("ID", justify="right", width=widths["W_ID"], no_wrap=True)
-                    table.add_column("Başlık", justify="left", min_width=widths["W_TITLE"], max_width=widths["W_TITLE"], overflow="fold")
-                    table.add_column("Yazar", justify="left", min_width=widths["W_AUTHOR"], max_width=widths["W_AUTHOR"], overflow="fold")
-                    table.add_column("Durum", justify="center", width=widths["W_DURUM"], no_wrap=True)
-                    for b in res:
-                        bid = str(b.get("id") or "")
-                        t = Text(b.get("title") or "")
-                        a_txt = Text(b.get("author") or "")
-                        toks = (norm_key(q) or "").split()
-                        if toks:
-                            t.highlight_words(toks, style="warn", case_sensitive=False)
-                            a_txt.highlight_words(toks, style="warn", case_sensitive=False)
-                        status_txt = _format_status(b, compact=True)
-                        pill = f"[pill_av] {status_txt} [/pill_av]" if b.get("available") else f"[pill_na] {status_txt} [/pill_na]"
-                        table.add_row(bid, t, a_txt, pill)
-                    console.print(table)
-                    console.print(Text(f"{len(res)} sonuç", style="muted"))
-                else:
-                    print(f"{len(res)} sonuç:")
-                    toks = (norm_key(q) or "").split()
-                    def hi(text: str) -> str:
-                        low = text.lower(); out = text
-                        for tok in toks:
-                            i = low.find(tok)
-                            if i >= 0:
-                                out = out[:i]+ANSI_YELLOW+out[i:i+len(tok)]+ANSI_RESET+out[i+len(tok):]
-                                low = out.lower().replace(ANSI_YELLOW,"").replace(ANSI_RESET,"")
-                        return out
-                    for b in res:
-                        print(" -", hi(b.get("title") or ""), "—", hi(b.get("author") or ""))
-
-            elif cmd == "e":
-                t = input("Başlık: ").strip(); a = input("Yazar: ").strip()
-                add_book_pro(books, t, a, disallow_duplicates=True)
-                if HAS_RICH: console.print("[ok]✓ Eklendi.[/ok]")
-                else: print("✓ Eklendi.")
-                _autosave(books, persist_path); print_inventory(books)
-
-            elif cmd == "b":
-                bid = int(input("Ödünç verilecek ID: ").strip()); user = input("Kullanıcı adı: ").strip()
-                days = int((input("Gün sayısı (örn 14): ").strip() or "14"))
-                ok = borrow_book_safe(books, bid, user, days=days)
-                if ok:
-                    if HAS_RICH: console.print("[ok]✓ Ödünç verildi.[/ok]")
-                    else: print("✓ Ödünç verildi.")
-                    _autosave(books, persist_path); print_inventory(books)
-                else:
-                    msg = "Verilemedi (kitap yok ya da zaten ödünçte). Waitlist'e eklemeyi deneyin (w)."
-                    if HAS_RICH: console.print(f"[err]{msg}[/err]")
-                    else: print(msg)
-
-            elif cmd == "w":
-                bid = int(input("Waitlist ID: ").strip()); user = input("Kullanıcı adı: ").strip()
-                ok = join_waitlist(books, bid, user)
-                if ok:
-                    if HAS_RICH: console.print("[ok]✓ Waitlist'e eklendi.[/ok]")
-                    else: print("✓ Waitlist'e eklendi.")
-                else:
-                    if HAS_RICH: console.print("[err]Eklenemedi.[/err]")
-                    else: print("Eklenemedi.")
-                _autosave(books, persist_path); print_inventory(books)
-
-            elif cmd == "r":
-                bid = int(input("Yenilenecek ID: ").strip()); extra = int(input("Ek gün (örn 7): ").strip() or "7")
-                ok = renew_book(books, bid, extra_days=extra, max_total_days=28)
-                if ok:
-                    if HAS_RICH: console.print("[ok]✓ Yenilendi.[/ok]")
-                    else: print("✓ Yenilendi.")
-                else:
-                    if HAS_RICH: console.print("[err]Yenilenemedi.[/err]")
-                    else: print("Yenilenemedi.")
-                _autosave(books, persist_path); print_inventory(books)
-
-            elif cmd == "o":
-                lst, n, fee = list_overdue_stats(books, today=_today_str(), fee_per_day=fee_per_day)
-                msg = f"Geciken {n} kitap (tahmini ücret={fee:.2f}): {[b.get('title') for b in lst]}"
-                if HAS_RICH: console.print(f"[warn]{msg}[/warn]")
-                else: print(msg)
-
-            elif cmd == "i":
-                bid = int(input("İade edilecek ID: ").strip())
-                ok, delay, fee = return_book_with_delay_fee(books, bid, fee_per_day=fee_per_day)
-                if ok:
-                    if HAS_RICH: console.print(f"[ok]✓ İade.[/ok] Gecikme={delay} gün, Ücret={fee:.2f}")
-                    else: print(f"✓ İade. Gecikme={delay} gün, Ücret={fee:.2f}")
-                    _autosave(books, persist_path); print_inventory(books)
-                else:
-                    if HAS_RICH: console.print("[err]Bulunamadı.[/err]")
-                    else: print("Bulunamadı.")
-
-            elif cmd == "x":
-                path = input("CSV yol (örn export.csv): ").strip() or "export.csv"
-                export_to_csv(books, path)
-                if HAS_RICH: console.print("[ok]✓ Dışa aktarıldı.[/ok]")
-                else: print("✓ Dışa aktarıldı.")
-
-            elif cmd == "m":
-                path = input("CSV yol (örn import.csv): ").strip() or "import.csv"
-                n = import_from_csv(books, path)
-                if HAS_RICH: console.print(f"[ok]✓ İçe aktarıldı (eklenen={n}).[/ok]")
-                else: print(f"✓ İçe aktarıldı (eklenen={n}).")
-                _autosave(books, persist_path); print_inventory(books)
-
-            elif cmd == "k":
-                _autosave(books, persist_path)
-
-            elif cmd == "y":
-                books[:] = load_from_file_safe(persist_path or "books_pro.json", on_missing=print)
-                if HAS_RICH: console.print(f"[ok]✓ Yüklendi. Toplam: {len(books)}[/ok]")
-                else: print(f"✓ Yüklendi. Toplam: {len(books)}")
-                print_inventory(books)
-
-            elif cmd == "u":
-                fee_per_day = float(input("Günlük ücret (örn 1.5): ").strip())
-                if HAS_RICH: console.print(f"[ok]✓ Güncellendi: {fee_per_day:.2f}[/ok]")
-                else: print(f"✓ Güncellendi: {fee_per_day:.2f}")
-
-            elif cmd == "q":
-                _autosave(books, persist_path)
-                if HAS_RICH: console.print("[muted]Görüşürüz! 👋[/muted]")
-                else: print("Görüşürüz! 👋")
-                break
-
-            else:
-                if HAS_RICH: console.print("[muted]Komut: t/s/a/e/b/w/r/o/i/x/m/k/y/u/q[/muted]")
-                else: print("Komut: t/s/a/e/b/w/r/o/i/x/m/k/y/u/q")
-
+            if _HANDLERS.get(cmd, _cmd_unknown)(session): break
         except (ValidationError, DuplicateBookError, NotFoundError, ValueError) as e:
-            msg = f"Hata: {e}"
-            if HAS_RICH: console.print(f"[err]{msg}[/err]")
-            else: print(msg)
+            _err(f"Hata: {e}")
         except KeyboardInterrupt:
             print("\n(iptal)")
 
+def _parse_args(argv: Optional[List[str]] = None):
+    import argparse
+    p = argparse.ArgumentParser(description="Pro Kütüphane (JSON)")
+    p.add_argument("--verbose", action="store_true", help="değişiklikten sonra tüm envanteri çiz")
+    p.add_argument("--msgpack", action="store_true", help="kayıtları MessagePack biçiminde yaz")
+    p.add_argument("--autosave", choices=("always", "on_quit", "off"), default="always",
+                   help="always: her değişiklik kaydedilir; on_quit: yalnızca çıkışta (toplu CSV için önerilir); "
+                        "off: yalnızca 'k' ile")
+    args = p.parse_args(argv)
+    if args.msgpack and not HAS_MSGPACK:  # her kayıtta hata vermek yerine başlangıçta reddedilir
+        p.error("--msgpack için 'msgpack' paketi gerekli (pip install msgpack)")
+    return args
+
 if __name__ == "__main__":
-    main(seed=True)
+    args = _parse_args()
+    main(seed=True, verbose=args.verbose, fmt="msgpack" if args.msgpack else "json", autosave=args.autosave)
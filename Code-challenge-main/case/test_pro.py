@@ -110,6 +110,25 @@ def test_list_overdue_stats_count_and_total_fee():
     assert total_fee >= 0.0
 
 
+def test_unpadded_dates_accepted_like_strptime():
+    from library_pro import return_book_with_delay, _due_is_over
+    d = datetime.now() - timedelta(days=40)
+    unpadded = f"{d.year}-{d.month}-{d.day}"  # ör. 2025-1-5
+    books = make_seed_books()
+    b = next(x for x in books if x["id"] == 1)
+    b.update({"available": False, "borrower": "ali", "due_date": unpadded})
+    assert _due_is_over(b, f"{datetime.now().year}-{datetime.now().month}-{datetime.now().day}")
+    assert _due_is_over(b)
+    overs, _, fee = list_overdue_stats(books)
+    assert b in overs and fee > 0
+    t = datetime.now()
+    assert search_books_adv(books, "dune", due_before=f"{t.year}-{t.month}-{t.day}") == [b]
+    ok, delay = return_book_with_delay(books, 1)
+    assert ok and delay == 40
+    b.update({"available": False, "borrower": "ali", "due_date": "2025-02-30"})  # geçersiz gün
+    assert not _due_is_over(b)
+
+
 def test_renew_book_rules_ok_and_blocked():
     books = make_seed_books()
 
@@ -195,3 +214,417 @@ def test_search_filter_available_only_logic():
     # available=False filtresi çalışsın
     only_borrowed = search_books_adv(books, "e", mode="any", normalize=True, available=False)
     assert all(b.get("available") is False for b in only_borrowed)
+
+
+def test_id_index_tracks_list_changes():
+    books = make_seed_books()
+    assert borrow_book_safe(books, 1, "ali", days=7) is True
+
+    # Listeye dışarıdan eklenen kitap da bulunmalı (indeks kendini yeniler)
+    books.append({"id": 99, "title": "Sefiller", "author": "Victor Hugo", "available": True,
+                  "borrower": None, "due_date": None, "borrowed_at": None, "waitlist": []})
+    assert borrow_book_safe(books, 99, "ayşe", days=7) is True
+    assert books[-1]["borrower"] == "ayşe"
+
+    with pytest.raises(NotFoundError):
+        borrow_book_safe(books, 12345, "ali", days=7)
+
+    # Eleman yerinde değiştirilirse (uzunluk aynı) eski id bulunmamalı, yenisi bulunmalı
+    books[0] = {"id": 7, "title": "Sefiller", "author": "Victor Hugo", "available": True,
+                "borrower": None, "due_date": None, "borrowed_at": None, "waitlist": []}
+    with pytest.raises(NotFoundError):
+        borrow_book_safe(books, 1, "ali", days=7)
+    assert borrow_book_safe(books, 7, "veli", days=7) is True
+    assert books[0]["borrower"] == "veli"
+
+
+def test_new_ids_unique_after_in_place_id_edit(tmp_path):
+    books = make_seed_books()
+    add_book_pro(books, "Sefiller", "Victor Hugo")  # indeks (max_id) kurulur
+    books[2]["id"] = 9
+    assert add_book_pro(books, "Satranç", "Stefan Zweig")["id"] == 10
+    books[0] = {"id": 20, "title": "Dune", "author": "Frank Herbert", "available": True,
+                "borrower": None, "due_date": None, "borrowed_at": None, "waitlist": []}
+    p = tmp_path / "imp.csv"
+    p.write_text("title,author\nBeyaz Diş,Jack London\n", encoding="utf-8")
+    assert import_from_csv(books, str(p)) == 1
+    ids = [b["id"] for b in books]
+    assert ids[-1] == 21 and len(set(ids)) == len(ids)
+
+
+def test_duplicate_check_follows_title_edits(tmp_path):
+    books = []
+    add_book_pro(books, "Dune", "Frank Herbert", disallow_duplicates=True)
+    books[0]["title"] = "Dune Messiah"
+    assert add_book_pro(books, "Dune", "Frank Herbert", disallow_duplicates=True)["id"] == 2
+    with pytest.raises(DuplicateBookError):
+        add_book_pro(books, "Dune Messiah", "Frank Herbert", disallow_duplicates=True)
+    p = tmp_path / "imp.csv"
+    p.write_text("title,author\nDune Messiah,Frank Herbert\nBeyaz Diş,Jack London\n", encoding="utf-8")
+    assert import_from_csv(books, str(p)) == 1
+
+
+def test_cached_search_keys_not_persisted(tmp_path):
+    books = make_seed_books()
+    assert search_books_adv(books, "herbert", mode="any", normalize=False)
+    p = tmp_path / "books.json"
+    save_to_file_meta(books, str(p), with_meta=True)
+    with open(p, "r", encoding="utf-8") as f:
+        saved = json.load(f)["books"]
+    assert all(not k.startswith("_") for b in saved for k in b)
+
+
+def test_load_from_file_safe_returns_independent_copies(tmp_path):
+    books = make_seed_books()
+    p = tmp_path / "books.json"
+    save_to_file_meta(books, str(p), with_meta=True)
+
+    first = load_from_file_safe(str(p))
+    assert borrow_book_safe(first, 1, "ali", days=7) is True
+    first[2]["waitlist"].append("Mehmet")
+
+    # Dosya değişmedi → önbellekten gelir, ama önceki çağrının değişikliklerini taşımamalı
+    second = load_from_file_safe(str(p))
+    assert second[0]["available"] is True
+    assert second[2]["waitlist"] == ["Ayşe"]
+
+    # Kayıt sonrası yeni içerik okunur
+    save_to_file_meta(first, str(p), with_meta=True)
+    third = load_from_file_safe(str(p))
+    assert third[0]["available"] is False
+
+
+def test_load_cache_skips_large_files(tmp_path, monkeypatch):
+    import library_pro
+    p = tmp_path / "books.json"
+    save_to_file_meta(make_seed_books(), str(p), with_meta=True)
+    monkeypatch.setattr(library_pro, "_STREAM_MIN", p.stat().st_size - 1)  # dosya "büyük" sayılır
+    assert len(load_from_file_safe(str(p))) == 3
+    assert os.path.abspath(str(p)) not in library_pro._LOAD_CACHE
+
+
+def test_change_log_replayed_on_load_and_cleared_on_save(tmp_path):
+    from library_pro import _append_event, load_or_seed_demo
+    books = make_seed_books()
+    p = str(tmp_path / "books.json")
+    save_to_file_meta(books, p, with_meta=True)
+
+    assert borrow_book_safe(books, 1, "ali", days=7) is True
+    nb = add_book_pro(books, "Sefiller", "Victor Hugo")
+    _append_event(p, books[0]); _append_event(p, nb)
+    with open(p + ".log", "ab") as f:
+        f.write(b'{"op": "put", "bo')  # yarım kalmış satır yok sayılmalı
+
+    loaded = load_or_seed_demo(p, save_if_seed=False)
+    assert len(loaded) == len(books)
+    assert next(b for b in loaded if b["id"] == 1)["borrower"] == "ali"
+    assert search_books_adv(loaded, "sefiller")[0]["id"] == nb["id"]
+
+    save_to_file_meta(loaded, p, with_meta=True)
+    assert not os.path.exists(p + ".log")
+
+
+def test_print_inventory_limit_and_single_row(capsys, monkeypatch):
+    import library_pro
+    from library_pro import print_inventory, print_inventory_row
+    monkeypatch.setattr(library_pro, "_rich_ready", lambda: False)  # düz metin çıktısı
+    books = make_seed_books()
+    print_inventory(books, limit=1)
+    out = capsys.readouterr().out
+    assert "2 kitap daha" in out and "Toplam: 3 kitap" in out
+
+    print_inventory_row(books, 2)
+    out = capsys.readouterr().out
+    assert "Kürk Mantolu Madonna" in out and "Dune" not in out
+
+
+def test_new_badge_cache_keeps_books_json_serializable(capsys, monkeypatch):
+    import library_pro
+    from library_pro import print_inventory, _is_new
+    monkeypatch.setattr(library_pro, "_rich_ready", lambda: False)
+    books = make_seed_books()
+    new = add_book_pro(books, "Sefiller", "Victor Hugo")
+    books[0]["created_at"] = (datetime.now() - timedelta(days=3)).isoformat(timespec="seconds")
+    print_inventory(books)
+    capsys.readouterr()
+    json.dumps(books)  # önbellek alanları (ör. _created_ts) JSON'a yazılabilir olmalı
+    assert _is_new(new) and not _is_new(books[0])
+
+
+def test_print_inventory_paging(capsys, monkeypatch):
+    import library_pro
+    from library_pro import print_inventory
+    monkeypatch.setattr(library_pro, "_rich_ready", lambda: False)  # düz metin çıktısı
+    books = make_seed_books()
+    for i in range(4):
+        add_book_pro(books, f"Kitap {i}", "Yazar")
+    print_inventory(books, page=1, page_size=3)
+    out = capsys.readouterr().out
+    assert "Sayfa 2/3" in out
+    assert sum(line.startswith("[") for line in out.splitlines()) == 3
+
+
+def test_availability_counts_follow_borrow_and_return():
+    from library_pro import _counts
+    books = make_seed_books()
+    assert _counts(books)[:3] == (3, 2, 1)
+    assert borrow_book_safe(books, 1, "ali", days=7) is True
+    assert _counts(books)[:3] == (3, 1, 2)
+    return_book_with_delay_fee(books, 1)
+    add_book_pro(books, "Sefiller", "Victor Hugo")
+    assert _counts(books)[:3] == (4, 3, 1)
+
+    # Alan dışarıdan (API dışında) değiştirilse de sayımlar ve müsait listesi güncel kalmalı
+    books = make_seed_books()
+    b2 = next(b for b in books if b["id"] == 2)
+    b2.update({"available": False, "borrower": "ali", "due_date": (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")})
+    assert _counts(books) == (3, 1, 2, 2)
+
+
+def test_norm_key_batch_matches_norm_key():
+    from library_pro import norm_key, norm_key_batch
+    items = ["Dune", "  Kürk Mantolu Madonna ", "İSTANBUL ıI", "café", "ΟΔΟΣ", "", None, "a\x00b"]
+    assert norm_key_batch(items) == [norm_key(x) for x in items]
+    assert norm_key_batch(items[:5]) == [norm_key(x) for x in items[:5]]
+
+
+def test_msgpack_flag_rejected_without_package(monkeypatch, capsys):
+    import library_pro
+    monkeypatch.setattr(library_pro, "HAS_MSGPACK", False)
+    with pytest.raises(SystemExit):
+        library_pro._parse_args(["--msgpack"])
+    assert "msgpack" in capsys.readouterr().err
+    with pytest.raises(ValueError):
+        library_pro.main(seed=False, persist_path=None, fmt="msgpack")
+    assert library_pro._parse_args([]).msgpack is False
+
+
+def test_msgpack_format_roundtrip(tmp_path):
+    pytest.importorskip("msgpack")
+    books = make_seed_books()
+    assert borrow_book_safe(books, 1, "ali", days=7) is True
+    p = str(tmp_path / "books.bin")
+    save_to_file_meta(books, p, with_meta=True, fmt="msgpack")
+    with open(p, "rb") as f:
+        assert f.read(1) not in (b"{", b"[")
+    loaded = load_from_file_safe(p)  # biçim ilk bayttan tanınır
+    assert [b["title"] for b in loaded] == [b["title"] for b in books]
+    assert loaded[0]["borrower"] == "ali"
+
+
+@pytest.mark.parametrize("with_meta", [True, False])
+def test_streamed_json_load_roundtrip(tmp_path, monkeypatch, capsys, with_meta):
+    pytest.importorskip("ijson")
+    import library_pro
+    monkeypatch.setattr(library_pro, "_STREAM_MIN", 0)  # her dosya akışla ayrıştırılır
+    streamed = []
+    real_stream = library_pro._stream_books
+    monkeypatch.setattr(library_pro, "_stream_books", lambda path: streamed.append(path) or real_stream(path))
+    books = make_seed_books()
+    assert borrow_book_safe(books, 1, "ali", days=7) is True
+    p = str(tmp_path / "books.json")
+    save_to_file_meta(books, p, with_meta=with_meta)  # meta sarmalı ('books.item') ya da çıplak liste ('item')
+    loaded = load_from_file_safe(p)
+    assert streamed == [p]
+    assert [b["title"] for b in loaded] == [b["title"] for b in books]
+    assert loaded[0]["borrower"] == "ali" and loaded[2]["waitlist"] == ["Ayşe"]
+
+    with open(p, "rb") as f: raw = f.read()
+    with open(p, "wb") as f: f.write(raw[:len(raw) // 2])  # yarım dosya → ijson.JSONError → bozuk JSON
+    assert load_from_file_safe(p) == []
+    assert "bozuk JSON" in capsys.readouterr().err
+
+
+def _run_cli(monkeypatch, tmp_path, script, **kw):
+    """main()'i betik girdisiyle düz metin kipinde çalıştırır; kalıcı dosya tmp_path altında."""
+    import library_pro
+    monkeypatch.chdir(tmp_path)  # library_log.txt / CSV yolları
+    monkeypatch.setattr(library_pro, "_rich_ready", lambda: False)
+    for name in ("_STDIN_LINES", "_SAVE_FMT", "_AUTOSAVE", "_unsaved"):  # main() bunları değiştirir
+        monkeypatch.setattr(library_pro, name, getattr(library_pro, name))
+    monkeypatch.setattr("sys.stdin", io.StringIO(script))
+    library_pro.main(seed=True, persist_path=str(tmp_path / "books.json"), **kw)
+    return load_from_file_safe(str(tmp_path / "books.json"))
+
+
+def test_cli_import_then_reload_keeps_imported_books(tmp_path, monkeypatch, capsys):
+    with open(tmp_path / "imp.csv", "w", newline="", encoding="utf-8") as f:
+        f.write("title,author\nSefiller,Victor Hugo\nSatranç,Stefan Zweig\n")
+    on_disk = _run_cli(monkeypatch, tmp_path, "m\nimp.csv\ny\nq\n")
+    assert "Yüklendi. Toplam: 5" in capsys.readouterr().out
+    assert len(on_disk) == 5
+
+
+def _borrower(books, bid):
+    return next(b for b in books if b["id"] == bid)["borrower"]
+
+
+def test_cli_autosave_always_persists_change(tmp_path, monkeypatch):
+    on_disk = _run_cli(monkeypatch, tmp_path, "b\n1\nali\n7\nq\n", autosave="always")
+    assert _borrower(on_disk, 1) == "ali"
+
+
+def test_cli_autosave_on_quit_writes_once_without_log(tmp_path, monkeypatch, capsys):
+    import library_pro
+    calls = []
+    monkeypatch.setattr(library_pro, "_append_event", lambda *a: calls.append(a))
+    on_disk = _run_cli(monkeypatch, tmp_path, "b\n1\nali\n7\ny\nq\n", autosave="on_quit")
+    assert _borrower(on_disk, 1) == "ali"  # yükleme ('y') öncesi bekleyen kayıt yazıldı
+    assert "Yüklendi" in capsys.readouterr().out
+    assert calls == []  # değişiklik günlüğü tutulmaz
+
+
+def test_cli_autosave_off_requires_explicit_save(tmp_path, monkeypatch, capsys):
+    on_disk = _run_cli(monkeypatch, tmp_path, "b\n1\nali\n7\ny\nq\n", autosave="off")
+    assert _borrower(on_disk, 1) is None
+    assert "Kaydedilmemiş değişiklikler atılıyor" in capsys.readouterr().out
+    on_disk = _run_cli(monkeypatch, tmp_path, "b\n1\nali\n7\nk\nq\n", autosave="off")
+    assert _borrower(on_disk, 1) == "ali"
+    assert "Kaydedilmemiş" not in capsys.readouterr().out
+
+
+def test_search_index_survives_reorder_and_replacement():
+    books = make_seed_books()
+    assert search_books_adv(books, "dune")  # indeks kurulur
+    books.reverse()
+    assert [b["title"] for b in search_books_adv(books, "dune")] == ["Dune"]
+    assert search_books_adv(books, "du") and search_books_adv(books, "dun", mode="prefix")
+    books.sort(key=lambda b: b["id"])
+    books[0] = {"id": 7, "title": "Sefiller", "author": "Victor Hugo", "available": True,
+                "borrower": None, "due_date": None, "borrowed_at": None, "waitlist": []}
+    assert [b["id"] for b in search_books_adv(books, "sefiller")] == [7]
+    assert search_books_adv(books, "dune") == []
+
+
+def test_cached_keys_follow_title_and_author_edits():
+    from library_pro import _sorted_by_title
+    books = make_seed_books()
+    assert search_books_adv(books, "dune") and search_books_adv(books, "du", mode="prefix")  # anahtarlar/indeks kurulur
+    _sorted_by_title(books)
+    b = next(b for b in books if b["title"] == "Dune")
+    b["title"] = "Sefiller"; b["author"] = "Victor Hugo"
+    assert search_books_adv(books, "dune") == []
+    assert search_books_adv(books, "dun", mode="prefix") == []
+    assert [x["id"] for x in search_books_adv(books, "sefiller")] == [b["id"]]
+    assert [x["id"] for x in search_books_adv(books, "hugo", mode="all")] == [b["id"]]
+    assert [x["id"] for x in search_books_adv(books, "sef", mode="prefix")] == [b["id"]]
+    assert [x["id"] for x in search_books_adv(books, "sefil", normalize=False)] == [b["id"]]
+    assert _sorted_by_title(books)[-1] is b
+
+
+def test_numpy_and_numba_imported_lazily():
+    import subprocess, sys
+    code = ("import sys, library_pro as L; assert 'numpy' not in sys.modules and 'numba' not in sys.modules; "
+            "L.list_overdue_stats([{'id': 1, 'available': False, 'due_date': '2020-01-01'}]); "
+            "assert 'numpy' not in sys.modules")  # küçük listede saf Python yolu
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("path", ["numba", "busday"])
+def test_overdue_vec_matches_python_path(monkeypatch, path):
+    import random
+    import library_pro
+    from library_pro import _overdue_vec, _overdue_py, _VEC_MIN
+    if not library_pro._numpy_ready():
+        pytest.skip("numpy kurulu değil")
+    if path == "numba" and library_pro._numba_kernel() is None:
+        pytest.skip("numba kurulu değil")
+    monkeypatch.setattr(library_pro, "HAS_NUMBA", path == "numba")
+    rnd = random.Random(42)
+    base = datetime.now().date()
+    books = []
+    for i in range(_VEC_MIN + 500):
+        # sınırlar (bugün/dün/yarın), hafta sonları, çok büyük gecikmeler ve bozuk/boş tarihler
+        off = rnd.choice([0, 1, -1, 5, 6, 7, 13, 14, rnd.randint(-60, 400), rnd.randint(1000, 5000)])
+        due = (base - timedelta(days=off)).isoformat()
+        if i % 97 == 0: due = rnd.choice([None, "", "2025-02-30"])
+        books.append({"id": i, "available": i % 11 == 0, "due_date": due})
+    for today in (base, base + timedelta(days=3), base - timedelta(days=2)):
+        today_dt = datetime(today.year, today.month, today.day)
+        vec, vec_fee = _overdue_vec(books, today_dt, 1.5)
+        py, py_fee = _overdue_py(books, today.toordinal(), 1.5)
+        assert vec == py
+        assert vec_fee == pytest.approx(py_fee)
+
+
+def test_calc_fee_matches_day_by_day_reference():
+    from library_pro import calc_fee
+    today = datetime.now().date()
+    for d in range(-3, 501):
+        # eski gün gün döngü: dünden geriye d gün içindeki hafta içi günler
+        ref = sum(1 for i in range(max(d, 0)) if (today - timedelta(days=i + 1)).weekday() < 5)
+        assert calc_fee(d, base=1.25) == round(ref * 1.25, 2)
+        assert calc_fee(d, base=2.0, weekend_free=False) == (round(d * 2.0, 2) if d > 0 else 0.0)
+
+
+def _wait_for(cond, timeout=5.0):
+    import time
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond(): return True
+        time.sleep(0.01)
+    return cond()
+
+
+def test_background_writer_coalesces_burst_and_compacts_log(tmp_path, monkeypatch):
+    import time
+    import library_pro
+    from library_pro import _autosave, _log_change
+    monkeypatch.setattr(library_pro, "_SAVE_DELAY", 0.05)
+    monkeypatch.setattr(library_pro, "_AUTOSAVE", "always")
+    monkeypatch.setattr(library_pro, "_COMPACT_EVERY", 3)
+    monkeypatch.setattr(library_pro, "_log_ops", 0)
+    writes = []
+    real_save = library_pro.save_to_file_meta
+    monkeypatch.setattr(library_pro, "save_to_file_meta", lambda *a, **k: (writes.append(1), real_save(*a, **k)))
+    path = str(tmp_path / "books.json")
+    books = make_seed_books()
+
+    # Ani değişiklik dizisi → arka plan yazıcısı tek (ya da birkaç) yazımda en son hali yazar
+    for i in range(20):
+        books[0]["borrower"] = f"u{i}"; _autosave(books, path)
+    assert _wait_for(lambda: os.path.exists(path) and load_from_file_safe(path)[0]["borrower"] == "u19")
+    assert 1 <= len(writes) < 20
+    time.sleep(4 * library_pro._SAVE_DELAY)  # yazıcı boşa çıksın (kalan uyanma no-op)
+
+    # Tek kitaplık değişiklikler günlüğe eklenir; _COMPACT_EVERY satırda tam kayıtla sıkıştırılır
+    log_file = path + ".log"
+    books[1]["borrower"] = "ali"; _log_change(books, path, books[1])
+    books[1]["borrower"] = "veli"; _log_change(books, path, books[1])
+    with open(log_file, "rb") as f:
+        assert len(f.read().splitlines()) == 2
+    books[2]["borrower"] = "can"; _log_change(books, path, books[2])
+    assert _wait_for(lambda: not os.path.exists(log_file))
+    on_disk = load_from_file_safe(path)
+    assert (on_disk[1]["borrower"], on_disk[2]["borrower"]) == ("veli", "can")
+
+
+def test_flush_writes_pending_save_immediately(tmp_path, monkeypatch):
+    import library_pro
+    from library_pro import _autosave, _flush
+    monkeypatch.setattr(library_pro, "_SAVE_DELAY", 5.0)  # yazıcı beklerken _flush hemen yazmalı
+    path = str(tmp_path / "books.json")
+    books = make_seed_books()
+    books[0]["borrower"] = "ali"
+    _autosave(books, path)
+    assert _flush() is True
+    assert load_from_file_safe(path)[0]["borrower"] == "ali"
+    assert _flush() is False  # bekleyen bir şey kalmadı
+
+
+def test_flush_keeps_pending_save_when_write_fails(tmp_path, monkeypatch):
+    import library_pro
+    from library_pro import _autosave, _flush
+    monkeypatch.setattr(library_pro, "_SAVE_DELAY", 5.0)
+    path = str(tmp_path / "books.json")
+    books = make_seed_books()
+    _autosave(books, path)
+    real_save = library_pro.save_to_file_meta
+    def broken(*a, **k): raise OSError("disk dolu")
+    monkeypatch.setattr(library_pro, "save_to_file_meta", broken)
+    with pytest.raises(OSError):
+        _flush()
+    assert library_pro._dirty is True  # kayıt kaybolmadı
+    monkeypatch.setattr(library_pro, "save_to_file_meta", real_save)
+    assert _flush() is True
+    assert len(load_from_file_safe(path)) == 3